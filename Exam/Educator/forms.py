@@ -1,6 +1,7 @@
 from django import forms 
 from .models import FacultyInfo
 from django.contrib.auth.models import User
+from student.utils import email_in_use
 
 class FacultyForm(forms.ModelForm):
     class Meta():
@@ -12,6 +13,12 @@ class FacultyForm(forms.ModelForm):
             'username' : forms.TextInput(attrs = {'id':'usernamefield','class':'form-control'})
         }
 
+    def clean_email(self):
+        email = self.cleaned_data.get('email')
+        if email and email_in_use(email):
+            raise forms.ValidationError("An account with this email already exists.")
+        return email
+
 class FacultyInfoForm(forms.ModelForm):
     class Meta():
         model = FacultyInfo
@@ -5,13 +5,13 @@ from .models import FacultyInfo
 from django.contrib import auth
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.mail import EmailMessage
-import threading
 from django.contrib.sites.shortcuts import get_current_site
-from student.views import EmailThread
+from django.conf import settings
+from student.tasks import queue_email
 from django.contrib.auth.models import User
 from django.contrib.auth.models import Group
-from questions.views import has_group
+from django.db import IntegrityError
+from student.utils import is_email_conflict
 
 @login_required(login_url='faculty-login')
 def index(request):
@@ -29,22 +29,22 @@ class Register(View):
         email = request.POST['email']
 
         if faculty_form.is_valid() and faculty_info_form.is_valid():
-            faculty = faculty_form.save()
+            try:
+                faculty = faculty_form.save()
+            except IntegrityError as e:
+                # A concurrent signup can still win the race past clean_email
+                if not is_email_conflict(e):
+                    raise
+                messages.error(request,"An account with this email already exists.")
+                return render(request,'faculty/register.html',{'faculty_form':faculty_form,'faculty_info_form':faculty_info_form})
             faculty.set_password(faculty.password)
             faculty.is_active = True
             faculty.is_staff = True
             faculty.save()
 
-            domain = get_current_site(request).domain
+            domain = settings.SITE_DOMAIN or get_current_site(request).domain
             email_subject = 'Activate your Exam Portal Faculty account'
             email_body = "Hi. Please contact the admin team of "+domain+". To register yourself as a professor."+ ".\n\n You are receiving this message because you registered on " + domain +". If you didn't register please contact support team on " + domain 
-            fromEmail = 'noreply@exam.com'
-            email = EmailMessage(
-				email_subject,
-				email_body,
-				fromEmail,
-				[email],
-            )
             student_info = faculty_info_form.save(commit=False)
             student_info.user = faculty
             if 'picture' in request.FILES:
@@ -53,10 +53,15 @@ class Register(View):
             student_info.is_active = True
             student_info.save()
             messages.success(request,"Registered Succesfully. Check Email for confirmation")
-            EmailThread(email).start()
+            queue_email(email_subject, email_body, [email])
             return redirect('faculty-login')
         else:
             print(faculty_form.errors,faculty_info_form.errors)
+            # The template only shows messages, so surface field errors (e.g. a taken email) there
+            for form in (faculty_form, faculty_info_form):
+                for errors in form.errors.values():
+                    for error in errors:
+                        messages.error(request,error)
             return render(request,'faculty/register.html',{'faculty_form':faculty_form,'faculty_info_form':faculty_info_form})
     
 class LoginView(View):
@@ -65,18 +70,21 @@ class LoginView(View):
 	def post(self,request):
 		username = request.POST['username']
 		password = request.POST['password']
-		has_grp = False
 		if username and password:
-			user = auth.authenticate(username=username,password=password)
-			exis = User.objects.filter(username=username).exists()
+			user = User.objects.prefetch_related('groups').filter(username=username).first()
+			exis = user is not None
+			# Always run the hasher first so response time doesn't reveal which accounts exist
 			if exis:
-				user_ch = User.objects.get(username=username)
-				has_grp = has_group(user_ch,"Professor")
-			if user and user.is_active and exis and has_grp:
+				password_ok = user.check_password(password)
+			else:
+				User().set_password(password)
+				password_ok = False
+			has_grp = exis and any(group.name == "Professor" for group in user.groups.all())
+			if password_ok and has_grp and user.is_active:
 				auth.login(request,user)
 				messages.success(request,"Welcome, "+ user.username + ". You are now logged in.")
 				return redirect('faculty-index')
-			elif not has_grp and exis:
+			elif password_ok and not has_grp:
 				messages.error(request,'You dont have permssions to login as faculty. If You think this is a mistake please contact admin')	
 				return render(request,'faculty/login.html')
                 
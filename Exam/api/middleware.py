@@ -0,0 +1,31 @@
+"""
+Per-request user context for the API endpoints
+"""
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from student.models import StudentInfo
+
+
+def get_student_info(request):
+    """Return the user's StudentInfo, or None for anonymous users and non-students"""
+    if not request.user.is_authenticated:
+        return None
+    try:
+        # The reverse accessor caches request.user on the result, so no join is needed
+        return request.user.studentinfo
+    except StudentInfo.DoesNotExist:
+        return None
+
+
+class UserContextMiddleware(MiddlewareMixin):
+    """
+    Attach the student profile to API requests so handlers share a single
+    lookup. Loaded lazily, so faculty calls that never touch it pay nothing.
+    Must run after AuthenticationMiddleware.
+    """
+    
+    def process_request(self, request):
+        if request.path.startswith('/api/'):
+            request.student_info = SimpleLazyObject(lambda: get_student_info(request))
+        return None
@@ -0,0 +1,29 @@
+"""
+Signal handlers keeping cached API permission flags in sync
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+
+def professor_cache_key(user_id):
+    """Cache key for a user's Professor group membership"""
+    return f"api:is_professor:{user_id}"
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def clear_professor_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached Professor membership whenever a user's groups change"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    
+    if not reverse:
+        user_ids = [instance.pk]
+    elif pk_set is not None:
+        user_ids = pk_set
+    else:
+        # group.user_set.clear() does not report the affected users
+        user_ids = instance.user_set.values_list('pk', flat=True)
+    
+    cache.delete_many([professor_cache_key(user_id) for user_id in user_ids])
@@ -1,26 +1,155 @@
 """
 Enhanced API endpoints with better validation and error responses
 """
-from django.http import JsonResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.cache import cache_page
+from django.views.decorators.http import etag
+from django.core.cache import cache
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.core.validators import EmailValidator
+from django.db import IntegrityError, transaction
+from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Avg, Prefetch
-import json
+from django.db.models import Q, Count, Sum, Max, Prefetch, F, Value, Case, When, CharField
+from django.db.models.functions import Coalesce, Concat, Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+import hashlib
+from itertools import chain
 import logging
+import orjson
 
-from student.models import StudentInfo, StuExam_DB, StuResults_DB
+from student.models import StudentInfo, StuExam_DB, StuResults_DB, Stu_Question
+from student.utils import email_in_use, is_email_conflict
+from student.signals import api_user_cache_key, exam_count_generation
 from questions.question_models import Question_DB
 from questions.questionpaper_models import Question_Paper
 from security.rate_limiting import rate_limit_decorator, exam_security_check
+from .signals import professor_cache_key
 
 logger = logging.getLogger(__name__)
 
+# Cache lifetimes (seconds) for polled read endpoints
+USER_CACHE_TTL = 60
+GLOBAL_CACHE_TTL = 300
+PROFESSOR_CACHE_TTL = 60 * 60
+
+# Built once at import so its compiled patterns are reused across requests
+_email_validator = EmailValidator()
+
+
+def user_cache_key(request, name):
+    """Build a per-user cache key for an API payload"""
+    return api_user_cache_key(request.user.id, name)
+
+
+def parse_json_body(request):
+    """Decode a JSON request body with orjson; raises orjson.JSONDecodeError"""
+    return orjson.loads(request.body)
+
+
+def is_professor(request):
+    """
+    Check Professor group membership once per request, backed by a per-user
+    cache entry that api.signals clears when the user's groups change
+    """
+    if not hasattr(request, '_is_professor'):
+        request._is_professor = cache.get_or_set(
+            professor_cache_key(request.user.id),
+            lambda: request.user.groups.filter(name='Professor').exists(),
+            PROFESSOR_CACHE_TTL
+        )
+    return request._is_professor
+
+
+def faculty_listing_etag(request, endpoint):
+    """
+    ETag for the faculty question/exam listings, built from the newest
+    updated_at and the row count so edits and deletions both change it.
+    Returns None (no ETag) for other endpoints and non-professors.
+    """
+    model = {'questions': Question_DB, 'exams': Question_Paper}.get(endpoint)
+    if model is None or not request.user.is_authenticated or not is_professor(request):
+        return None
+    
+    state = model.objects.filter(professor=request.user, is_active=True).aggregate(
+        latest=Max('updated_at'),
+        total=Count('pk')
+    )
+    fingerprint = f"{state['latest']}:{state['total']}"
+    if endpoint == 'exams':
+        # Adding or removing questions only touches the M2M table, not the paper's updated_at
+        links = Question_Paper.questions.through.objects.filter(
+            question_paper__professor=request.user,
+            question_paper__is_active=True
+        ).aggregate(total=Count('pk'), latest=Max('pk'))
+        fingerprint = f"{fingerprint}:{links['total']}:{links['latest']}"
+    request._listing_etag = hashlib.md5(fingerprint.encode()).hexdigest()
+    return f'W/"{request._listing_etag}"'
+
+
+def build_student_profile(user, student_info):
+    """Profile payload shared by the profile endpoint and its ETag"""
+    # StudentInfo carries no timestamps, so the account's join date stands in for created_at
+    return {
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'address': student_info.address,
+        'stream': student_info.stream,
+        'picture_url': student_info.picture.url if student_info.picture else None,
+        'created_at': user.date_joined,
+        'updated_at': None
+    }
+
+
+def student_profile_etag(request, endpoint):
+    """
+    ETag for the student profile, hashed from the already-loaded user and
+    StudentInfo rows (which have no updated_at). Costs no extra query and
+    spares the body on revalidation. None for other endpoints.
+    """
+    if endpoint != 'profile' or not request.user.is_authenticated or not request.student_info:
+        return None
+    profile = build_student_profile(request.user, request.student_info)
+    digest = hashlib.md5(str(request.user.pk).encode() + orjson.dumps(profile)).hexdigest()
+    return f'W/"{digest}"'
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that shares its COUNT(*) through the cache for a short time
+    """
+    
+    def __init__(self, object_list, per_page, count_cache_key, count_ttl=30, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_ttl = count_ttl
+    
+    @cached_property
+    def count(self):
+        return cache.get_or_set(self.count_cache_key, lambda: super(CachedCountPaginator, self).count, self.count_ttl)
+
+
+def stream_json_array(iterable):
+    """Yield a JSON array one encoded row at a time"""
+    yield b'['
+    try:
+        for index, row in enumerate(iterable):
+            if index:
+                yield b','
+            yield orjson.dumps(row, option=orjson.OPT_NAIVE_UTC)
+    except Exception as e:
+        # Headers are already sent; log it and let the server abort the response
+        logger.exception("Error while streaming JSON array: %s", e)
+        raise
+    yield b']'
+
 
 class APIResponse:
     """
@@ -35,7 +164,7 @@ class APIResponse:
             'message': message,
             'data': data
         }
-        return JsonResponse(response_data, status=status_code)
+        return APIResponse._render(response_data, status_code)
     
     @staticmethod
     def error(message="Error", errors=None, status_code=400):
@@ -45,41 +174,70 @@ class APIResponse:
             'message': message,
             'errors': errors or {}
         }
-        return JsonResponse(response_data, status=status_code)
+        return APIResponse._render(response_data, status_code)
     
     @staticmethod
     def validation_error(errors, message="Validation failed"):
         """Return validation error response"""
         return APIResponse.error(message=message, errors=errors, status_code=422)
+    
+    @staticmethod
+    def stream(rows, message="Success"):
+        """
+        Return a success response whose data array is streamed row by row,
+        so large result sets never sit in memory as one payload
+        """
+        def content():
+            yield b'{"success":true,"message":' + orjson.dumps(message) + b',"data":'
+            yield from stream_json_array(rows)
+            yield b'}'
+        
+        return StreamingHttpResponse(content(), content_type='application/json')
+    
+    @staticmethod
+    def _render(response_data, status_code):
+        """Serialize with orjson, which handles datetimes natively"""
+        return HttpResponse(
+            orjson.dumps(response_data, option=orjson.OPT_NAIVE_UTC),
+            status=status_code,
+            content_type='application/json'
+        )
 
 
 @method_decorator([csrf_exempt, rate_limit_decorator('api')], name='dispatch')
+@method_decorator(etag(student_profile_etag), name='get')
 class StudentAPIView(View):
     """
     Enhanced student API endpoints
     """
     
+    GET_HANDLERS = {
+        'profile': 'get_student_profile',
+        'exams': 'get_student_exams',
+        'results': 'get_student_results',
+        'stats': 'get_student_stats',
+        'recent_activity': 'get_recent_activity',
+    }
+    
+    POST_HANDLERS = {
+        'update_profile': 'update_student_profile',
+        'submit_exam': 'submit_exam',
+        'update_preferences': 'update_preferences',
+    }
+    
     def get(self, request, endpoint):
         """Handle GET requests"""
         try:
             if not request.user.is_authenticated:
                 return APIResponse.error("Authentication required", status_code=401)
             
-            if endpoint == 'profile':
-                return self.get_student_profile(request)
-            elif endpoint == 'exams':
-                return self.get_student_exams(request)
-            elif endpoint == 'results':
-                return self.get_student_results(request)
-            elif endpoint == 'stats':
-                return self.get_student_stats(request)
-            elif endpoint == 'recent_activity':
-                return self.get_recent_activity(request)
-            else:
+            handler_name = self.GET_HANDLERS.get(endpoint)
+            if handler_name is None:
                 return APIResponse.error("Invalid endpoint", status_code=404)
+            return getattr(self, handler_name)(request)
                 
         except Exception as e:
-            logger.error(f"Error in StudentAPIView GET: {e}")
+            logger.exception("Error in StudentAPIView GET: %s", e)
             return APIResponse.error("Internal server error", status_code=500)
     
     def post(self, request, endpoint):
@@ -88,40 +246,22 @@ class StudentAPIView(View):
             if not request.user.is_authenticated:
                 return APIResponse.error("Authentication required", status_code=401)
             
-            if endpoint == 'update_profile':
-                return self.update_student_profile(request)
-            elif endpoint == 'submit_exam':
-                return self.submit_exam(request)
-            elif endpoint == 'update_preferences':
-                return self.update_preferences(request)
-            else:
+            handler_name = self.POST_HANDLERS.get(endpoint)
+            if handler_name is None:
                 return APIResponse.error("Invalid endpoint", status_code=404)
+            return getattr(self, handler_name)(request)
                 
         except Exception as e:
-            logger.error(f"Error in StudentAPIView POST: {e}")
+            logger.exception("Error in StudentAPIView POST: %s", e)
             return APIResponse.error("Internal server error", status_code=500)
     
     def get_student_profile(self, request):
         """Get student profile information"""
-        try:
-            student_info = StudentInfo.objects.select_related('user').get(user=request.user)
-            
-            profile_data = {
-                'username': student_info.user.username,
-                'email': student_info.user.email,
-                'first_name': student_info.user.first_name,
-                'last_name': student_info.user.last_name,
-                'address': student_info.address,
-                'stream': student_info.stream,
-                'picture_url': student_info.picture.url if student_info.picture else None,
-                'created_at': student_info.created_at.isoformat(),
-                'updated_at': student_info.updated_at.isoformat()
-            }
-            
-            return APIResponse.success(data=profile_data)
-            
-        except StudentInfo.DoesNotExist:
+        student_info = request.student_info
+        if not student_info:
             return APIResponse.error("Student profile not found", status_code=404)
+        
+        return APIResponse.success(data=build_student_profile(request.user, student_info))
     
     def get_student_exams(self, request):
         """Get student exams with pagination and filtering"""
@@ -133,9 +273,7 @@ class StudentAPIView(View):
             search = request.GET.get('search', '')
             
             # Build query
-            query = StuExam_DB.objects.filter(student=request.user).select_related(
-                'qpaper', 'qpaper__professor'
-            ).prefetch_related('questions')
+            query = StuExam_DB.objects.filter(student=request.user)
             
             # Apply filters
             if status == 'completed':
@@ -149,26 +287,47 @@ class StudentAPIView(View):
                     Q(qpaper__qPaperTitle__icontains=search)
                 )
             
-            # Order by creation date
-            query = query.order_by('-created_at')
+            # Order by creation date and fetch plain dicts instead of model instances
+            query = query.order_by('-created_at').values(
+                'id', 'score', 'completed', 'created_at', 'updated_at',
+                exam_name=F('examname'),
+                qpaper_title=Coalesce(F('qpaper__qPaperTitle'), Value('N/A')),
+                professor=Coalesce(F('qpaper__professor__username'), Value('N/A'))
+            )
+            
+            # Keyset pagination: ?after=<iso-datetime> pages by created_at with no COUNT query
+            if 'after' in request.GET:
+                after = request.GET['after']
+                if after:
+                    after_dt = parse_datetime(after)
+                    if after_dt is None:
+                        return APIResponse.validation_error({'after': ['Invalid datetime']})
+                    if timezone.is_naive(after_dt):
+                        after_dt = timezone.make_aware(after_dt)
+                    query = query.filter(created_at__lt=after_dt)
+                
+                rows = list(query[:per_page + 1])
+                has_next = len(rows) > per_page
+                rows = rows[:per_page]
+                
+                return APIResponse.success(data={
+                    'exams': [{**exam, 'completed': bool(exam['completed'])} for exam in rows],
+                    'pagination': {
+                        'next_cursor': rows[-1]['created_at'].isoformat() if has_next else None,
+                        'has_next': has_next
+                    }
+                })
             
-            # Paginate
-            paginator = Paginator(query, per_page)
+            # Paginate, reusing a recent count for the same filters
+            search_hash = hashlib.md5(search.encode()).hexdigest()
+            paginator = CachedCountPaginator(
+                query, per_page,
+                count_cache_key=f"exam_count:{request.user.id}:{exam_count_generation(request.user.id)}:{status}:{search_hash}"
+            )
             page_obj = paginator.get_page(page)
             
             # Serialize data
-            exams_data = []
-            for exam in page_obj:
-                exams_data.append({
-                    'id': exam.id,
-                    'exam_name': exam.examname,
-                    'qpaper_title': exam.qpaper.qPaperTitle if exam.qpaper else 'N/A',
-                    'professor': exam.qpaper.professor.username if exam.qpaper and exam.qpaper.professor else 'N/A',
-                    'score': exam.score,
-                    'completed': bool(exam.completed),
-                    'created_at': exam.created_at.isoformat(),
-                    'updated_at': exam.updated_at.isoformat()
-                })
+            exams_data = [{**exam, 'completed': bool(exam['completed'])} for exam in page_obj]
             
             response_data = {
                 'exams': exams_data,
@@ -184,19 +343,14 @@ class StudentAPIView(View):
             return APIResponse.success(data=response_data)
             
         except Exception as e:
-            logger.error(f"Error in get_student_exams: {e}")
+            logger.exception("Error in get_student_exams: %s", e)
             return APIResponse.error("Failed to retrieve exams")
     
     def get_student_results(self, request):
         """Get student results with detailed statistics"""
         try:
             # Get student results
-            student_results = StuResults_DB.objects.filter(
-                student=request.user
-            ).prefetch_related(
-                'exams__qpaper',
-                'exams__questions'
-            ).first()
+            student_results = StuResults_DB.objects.filter(student=request.user).first()
             
             if not student_results:
                 return APIResponse.success(data={
@@ -209,28 +363,15 @@ class StudentAPIView(View):
                     }
                 })
             
-            # Process results
-            results_data = []
-            total_score = 0
-            completed_count = 0
-            
-            for exam in student_results.exams.all():
-                results_data.append({
-                    'id': exam.id,
-                    'exam_name': exam.examname,
-                    'qpaper_title': exam.qpaper.qPaperTitle if exam.qpaper else 'N/A',
-                    'score': exam.score,
-                    'completed': bool(exam.completed),
-                    'created_at': exam.created_at.isoformat()
-                })
-                
-                if exam.completed:
-                    total_score += exam.score
-                    completed_count += 1
-            
-            # Calculate statistics
-            total_exams = len(results_data)
-            average_score = total_score / completed_count if completed_count > 0 else 0
+            # Calculate statistics in a single aggregate query
+            stats = student_results.exams.aggregate(
+                total=Count('id'),
+                completed_count=Count('id', filter=Q(completed=1)),
+                total_score=Sum('score', filter=Q(completed=1))
+            )
+            total_exams = stats['total']
+            completed_count = stats['completed_count']
+            average_score = (stats['total_score'] or 0) / completed_count if completed_count > 0 else 0
             success_rate = (completed_count / total_exams * 100) if total_exams > 0 else 0
             
             statistics = {
@@ -240,6 +381,14 @@ class StudentAPIView(View):
                 'success_rate': round(success_rate, 2)
             }
             
+            # Process results
+            results = student_results.exams.values(
+                'id', 'score', 'completed', 'created_at',
+                exam_name=F('examname'),
+                qpaper_title=Coalesce(F('qpaper__qPaperTitle'), Value('N/A'))
+            )
+            results_data = [{**exam, 'completed': bool(exam['completed'])} for exam in results]
+            
             response_data = {
                 'results': results_data,
                 'statistics': statistics
@@ -248,40 +397,59 @@ class StudentAPIView(View):
             return APIResponse.success(data=response_data)
             
         except Exception as e:
-            logger.error(f"Error in get_student_results: {e}")
+            logger.exception("Error in get_student_results: %s", e)
             return APIResponse.error("Failed to retrieve results")
     
     def get_student_stats(self, request):
         """Get comprehensive student statistics"""
         try:
-            # Get exam statistics
-            exam_stats = StuExam_DB.objects.filter(student=request.user).aggregate(
-                total_exams=Count('id'),
-                completed_exams=Count('id', filter=Q(completed=1)),
-                average_score=Avg('score', filter=Q(completed=1)),
-                total_questions=Count('questions')
-            )
-            
-            # Get performance by subject (if available)
+            cache_key = user_cache_key(request, 'stats')
+            stats_data = cache.get(cache_key)
+            if stats_data is not None:
+                return APIResponse.success(data=stats_data)
+            
+            # One grouped query yields both the overall counters and the per-title figures.
+            # Counting questions in the same query would multiply every exam row by its
+            # question count, so that total comes from the M2M table on its own.
+            title_rows = StuExam_DB.objects.filter(
+                student=request.user
+            ).values('qpaper__qPaperTitle').annotate(
+                exam_count=Count('id'),
+                completed_count=Count('id', filter=Q(completed=1)),
+                scores_sum=Sum('score', filter=Q(completed=1))
+            ).order_by()
+            total_questions = StuExam_DB.questions.through.objects.filter(
+                stuexam_db__student=request.user
+            ).count()
+            
+            # Several titles can share a subject, so merge their totals
+            total_exams = completed_exams = completed_scores_sum = 0
             subject_performance = {}
-            exams = StuExam_DB.objects.filter(
-                student=request.user,
-                completed=1
-            ).select_related('qpaper')
-            
-            for exam in exams:
-                if exam.qpaper:
-                    subject = exam.qpaper.qPaperTitle.split()[0] if exam.qpaper.qPaperTitle else 'Unknown'
-                    if subject not in subject_performance:
-                        subject_performance[subject] = {'total': 0, 'scores': []}
-                    subject_performance[subject]['total'] += 1
-                    subject_performance[subject]['scores'].append(exam.score)
+            for row in title_rows:
+                scores_sum = row['scores_sum'] or 0
+                total_exams += row['exam_count']
+                completed_exams += row['completed_count']
+                completed_scores_sum += scores_sum
+                
+                title = row['qpaper__qPaperTitle']
+                if title is None or not row['completed_count']:
+                    continue
+                subject = title.split()[0] if title else 'Unknown'
+                bucket = subject_performance.setdefault(subject, {'total': 0, 'scores_sum': 0})
+                bucket['total'] += row['completed_count']
+                bucket['scores_sum'] += scores_sum
             
             # Calculate averages for each subject
-            for subject in subject_performance:
-                scores = subject_performance[subject]['scores']
-                subject_performance[subject]['average_score'] = sum(scores) / len(scores) if scores else 0
-                subject_performance[subject]['average_score'] = round(subject_performance[subject]['average_score'], 2)
+            for subject, bucket in subject_performance.items():
+                scores_sum = bucket.pop('scores_sum')
+                bucket['average_score'] = round(scores_sum / bucket['total'], 2) if bucket['total'] else 0
+            
+            exam_stats = {
+                'total_exams': total_exams,
+                'completed_exams': completed_exams,
+                'average_score': completed_scores_sum / completed_exams if completed_exams else None,
+                'total_questions': total_questions
+            }
             
             stats_data = {
                 'exam_statistics': exam_stats,
@@ -291,42 +459,47 @@ class StudentAPIView(View):
                     if exam_stats['total_exams'] > 0 else 0, 2
                 )
             }
+            cache.set(cache_key, stats_data, USER_CACHE_TTL)
             
             return APIResponse.success(data=stats_data)
             
         except Exception as e:
-            logger.error(f"Error in get_student_stats: {e}")
+            logger.exception("Error in get_student_stats: %s", e)
             return APIResponse.error("Failed to retrieve statistics")
     
     def get_recent_activity(self, request):
         """Get recent activity for student"""
         try:
-            # Get recent exams
-            recent_exams = StuExam_DB.objects.filter(
+            cache_key = user_cache_key(request, 'recent_activity')
+            activities = cache.get(cache_key)
+            if activities is not None:
+                return APIResponse.success(data=activities)
+            
+            # Get recent exams, with every activity field built in SQL
+            activities = list(StuExam_DB.objects.filter(
                 student=request.user
-            ).select_related('qpaper').order_by('-created_at')[:10]
-            
-            activities = []
-            for exam in recent_exams:
-                activities.append({
-                    'id': exam.id,
-                    'type': 'exam',
-                    'title': exam.examname,
-                    'description': f"Score: {exam.score}, Status: {'Completed' if exam.completed else 'Pending'}",
-                    'created_at': exam.created_at.isoformat(),
-                    'qpaper_title': exam.qpaper.qPaperTitle if exam.qpaper else 'N/A'
-                })
+            ).order_by('-created_at').values(
+                'id', 'created_at',
+                type=Value('exam'),
+                title=F('examname'),
+                description=Concat(
+                    Value('Score: '), Cast('score', CharField()), Value(', Status: '),
+                    Case(When(completed=1, then=Value('Completed')), default=Value('Pending'))
+                ),
+                qpaper_title=Coalesce(F('qpaper__qPaperTitle'), Value('N/A'))
+            )[:10])
+            cache.set(cache_key, activities, USER_CACHE_TTL)
             
             return APIResponse.success(data=activities)
             
         except Exception as e:
-            logger.error(f"Error in get_recent_activity: {e}")
+            logger.exception("Error in get_recent_activity: %s", e)
             return APIResponse.error("Failed to retrieve recent activity")
     
     def update_student_profile(self, request):
         """Update student profile"""
         try:
-            data = json.loads(request.body)
+            data = parse_json_body(request)
             
             # Validate required fields
             required_fields = ['first_name', 'last_name', 'email']
@@ -337,42 +510,69 @@ class StudentAPIView(View):
                     'missing_fields': missing_fields
                 })
             
+            # Non-string JSON values would reach the validators and model fields as-is
+            invalid_fields = [field for field in required_fields if not isinstance(data[field], str)]
+            if invalid_fields:
+                return APIResponse.validation_error({
+                    field: ['Must be a string'] for field in invalid_fields
+                })
+            
             # Validate email format
             email = data['email']
-            if '@' not in email or '.' not in email.split('@')[1]:
+            try:
+                _email_validator(email)
+            except ValidationError:
                 return APIResponse.validation_error({
                     'email': ['Invalid email format']
                 })
             
+            if email_in_use(email, exclude_pk=request.user.pk):
+                return APIResponse.validation_error({
+                    'email': ['An account with this email already exists']
+                })
+            
             # Update user profile
             with transaction.atomic():
                 user = request.user
                 user.first_name = data['first_name']
                 user.last_name = data['last_name']
                 user.email = email
-                user.save()
+                user.save(update_fields=['first_name', 'last_name', 'email'])
                 
-                # Update student info
-                student_info, created = StudentInfo.objects.get_or_create(user=user)
-                if 'address' in data:
-                    student_info.address = data['address']
-                if 'stream' in data:
-                    student_info.stream = data['stream']
-                student_info.save()
-            
+                # Update student info, writing only the fields that were sent
+                student_info = request.student_info
+                changed_fields = [field for field in ('address', 'stream') if field in data]
+                if not student_info:
+                    student_info = StudentInfo(user=user)
+                    for field in changed_fields:
+                        setattr(student_info, field, data[field])
+                    student_info.save()
+                elif changed_fields:
+                    for field in changed_fields:
+                        setattr(student_info, field, data[field])
+                    student_info.save(update_fields=changed_fields)
+
             return APIResponse.success(message="Profile updated successfully")
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return APIResponse.error("Invalid JSON data", status_code=400)
+        except IntegrityError as e:
+            # Lost a race with another account taking the same email
+            if is_email_conflict(e):
+                return APIResponse.validation_error({
+                    'email': ['An account with this email already exists']
+                })
+            logger.exception("Error in update_student_profile: %s", e)
+            return APIResponse.error("Failed to update profile")
         except Exception as e:
-            logger.error(f"Error in update_student_profile: {e}")
+            logger.exception("Error in update_student_profile: %s", e)
             return APIResponse.error("Failed to update profile")
     
-    @exam_security_check
+    @method_decorator(exam_security_check)
     def submit_exam(self, request):
         """Submit exam with security checks"""
         try:
-            data = json.loads(request.body)
+            data = parse_json_body(request)
             
             # Validate required fields
             required_fields = ['exam_id', 'answers']
@@ -388,24 +588,41 @@ class StudentAPIView(View):
             
             # Validate exam exists and is accessible
             try:
-                exam = StuExam_DB.objects.get(id=exam_id, student=request.user)
+                exam = StuExam_DB.objects.only('qpaper', 'student', 'completed', 'score').get(id=exam_id, student=request.user)
             except StuExam_DB.DoesNotExist:
                 return APIResponse.error("Exam not found", status_code=404)
             
+            # Load every question of the paper in one query, keyed like the answers
+            questions_map = {}
+            if exam.qpaper_id is not None:
+                questions_map = {
+                    str(qno): question
+                    for qno, question in Question_DB.objects.filter(question_paper=exam.qpaper_id).in_bulk().items()
+                }
+            
             # Process answers and calculate score
             with transaction.atomic():
                 # Update exam with answers and score
                 exam.completed = 1
-                exam.score = self.calculate_score(exam, answers)
-                exam.save()
+                exam.score = self.calculate_score(questions_map, answers)
+                exam.save(update_fields=['completed', 'score', 'updated_at'])
                 
-                # Create student questions for each answer
+                # Create student questions for each answer, copying the original question.
+                # Stu_Question is a multi-table child of Question_DB, so bulk_create is not available.
                 for question_id, answer in answers.items():
+                    question = questions_map.get(str(question_id))
+                    if question is None:
+                        continue
                     Stu_Question.objects.create(
                         student=request.user,
                         choice=answer,
-                        # Copy question data from original question
-                        **self.get_question_data(question_id)
+                        question=question.question,
+                        optionA=question.optionA,
+                        optionB=question.optionB,
+                        optionC=question.optionC,
+                        optionD=question.optionD,
+                        answer=question.answer,
+                        max_marks=question.max_marks
                     )
             
             return APIResponse.success(data={
@@ -414,112 +631,94 @@ class StudentAPIView(View):
                 'completed': True
             })
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return APIResponse.error("Invalid JSON data", status_code=400)
         except Exception as e:
-            logger.error(f"Error in submit_exam: {e}")
+            logger.exception("Error in submit_exam: %s", e)
             return APIResponse.error("Failed to submit exam")
     
     def update_preferences(self, request):
         """Update student preferences"""
         try:
-            data = json.loads(request.body)
+            data = parse_json_body(request)
             
             # This is a placeholder - implement based on your preference model
             # For now, just return success
             
             return APIResponse.success(message="Preferences updated successfully")
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return APIResponse.error("Invalid JSON data", status_code=400)
         except Exception as e:
-            logger.error(f"Error in update_preferences: {e}")
+            logger.exception("Error in update_preferences: %s", e)
             return APIResponse.error("Failed to update preferences")
     
-    def calculate_score(self, exam, answers):
+    def calculate_score(self, questions_map, answers):
         """Calculate exam score based on answers"""
         # This is a simplified calculation
         # Implement your actual scoring logic here
-        total_questions = exam.questions.count()
+        total_questions = len(questions_map)
         correct_answers = 0
         
-        for question in exam.questions.all():
-            question_id = str(question.qno)
+        for question_id, question in questions_map.items():
             if question_id in answers:
                 if answers[question_id] == question.answer:
                     correct_answers += 1
         
         return round((correct_answers / total_questions * 100), 2) if total_questions > 0 else 0
-    
-    def get_question_data(self, question_id):
-        """Get question data for creating student question"""
-        try:
-            question = Question_DB.objects.get(qno=question_id)
-            return {
-                'question': question.question,
-                'optionA': question.optionA,
-                'optionB': question.optionB,
-                'optionC': question.optionC,
-                'optionD': question.optionD,
-                'answer': question.answer,
-                'max_marks': question.max_marks
-            }
-        except Question_DB.DoesNotExist:
-            return {}
 
 
 @method_decorator([csrf_exempt, rate_limit_decorator('api')], name='dispatch')
+@method_decorator(etag(faculty_listing_etag), name='get')
 class FacultyAPIView(View):
     """
     Enhanced faculty API endpoints
     """
     
+    GET_HANDLERS = {
+        'questions': 'get_questions',
+        'exams': 'get_exams',
+        'students': 'get_students',
+        'statistics': 'get_faculty_stats',
+    }
+    
     def get(self, request, endpoint):
         """Handle GET requests for faculty"""
         try:
             if not request.user.is_authenticated:
                 return APIResponse.error("Authentication required", status_code=401)
             
-            if not request.user.groups.filter(name='Professor').exists():
+            if not is_professor(request):
                 return APIResponse.error("Faculty access required", status_code=403)
             
-            if endpoint == 'questions':
-                return self.get_questions(request)
-            elif endpoint == 'exams':
-                return self.get_exams(request)
-            elif endpoint == 'students':
-                return self.get_students(request)
-            elif endpoint == 'statistics':
-                return self.get_faculty_stats(request)
-            else:
+            handler_name = self.GET_HANDLERS.get(endpoint)
+            if handler_name is None:
                 return APIResponse.error("Invalid endpoint", status_code=404)
+            return getattr(self, handler_name)(request)
                 
         except Exception as e:
-            logger.error(f"Error in FacultyAPIView GET: {e}")
+            logger.exception("Error in FacultyAPIView GET: %s", e)
             return APIResponse.error("Internal server error", status_code=500)
     
     def get_questions(self, request):
         """Get questions created by faculty"""
         try:
-            questions = Question_DB.objects.filter(
-                professor=request.user,
-                is_active=True
-            ).order_by('-created_at')
-            
-            questions_data = []
-            for question in questions:
-                questions_data.append({
-                    'id': question.qno,
-                    'question': question.question,
-                    'max_marks': question.max_marks,
-                    'created_at': question.created_at.isoformat(),
-                    'updated_at': question.updated_at.isoformat()
-                })
+            # Keyed by the listing ETag so a changed listing never serves the old payload
+            cache_key = f"{user_cache_key(request, 'questions')}:{getattr(request, '_listing_etag', '')}"
+            questions_data = cache.get(cache_key)
+            if questions_data is None:
+                questions_data = list(Question_DB.objects.filter(
+                    professor=request.user,
+                    is_active=True
+                ).order_by('-created_at').values(
+                    'question', 'max_marks', 'created_at', 'updated_at', id=F('qno')
+                ))
+                cache.set(cache_key, questions_data, USER_CACHE_TTL)
             
             return APIResponse.success(data=questions_data)
             
         except Exception as e:
-            logger.error(f"Error in get_questions: {e}")
+            logger.exception("Error in get_questions: %s", e)
             return APIResponse.error("Failed to retrieve questions")
     
     def get_exams(self, request):
@@ -530,54 +729,48 @@ class FacultyAPIView(View):
                 is_active=True
             ).annotate(
                 question_count=Count('questions')
-            ).order_by('-created_at')
-            
-            exams_data = []
-            for exam in exams:
-                exams_data.append({
-                    'id': exam.id,
-                    'title': exam.qPaperTitle,
-                    'question_count': exam.question_count,
-                    'created_at': exam.created_at.isoformat(),
-                    'updated_at': exam.updated_at.isoformat()
-                })
+            ).order_by('-created_at').values(
+                'id', 'question_count', 'created_at', 'updated_at', title=F('qPaperTitle')
+            )
             
-            return APIResponse.success(data=exams_data)
+            return APIResponse.success(data=list(exams))
             
         except Exception as e:
-            logger.error(f"Error in get_exams: {e}")
+            logger.exception("Error in get_exams: %s", e)
             return APIResponse.error("Failed to retrieve exams")
     
     def get_students(self, request):
         """Get students for faculty"""
         try:
-            students = StudentInfo.objects.select_related('user').all()
-            
-            students_data = []
-            for student in students:
-                students_data.append({
-                    'id': student.user.id,
-                    'username': student.user.username,
-                    'email': student.user.email,
-                    'first_name': student.user.first_name,
-                    'last_name': student.user.last_name,
-                    'stream': student.stream,
-                    'created_at': student.created_at.isoformat()
-                })
+            # StudentInfo carries no timestamps, so the account's join date stands in for created_at
+            students = User.objects.filter(studentinfo__isnull=False).values(
+                'id', 'username', 'email', 'first_name', 'last_name',
+                stream=F('studentinfo__stream'),
+                created_at=F('date_joined')
+            )
             
-            return APIResponse.success(data=students_data)
+            # Pull the first row here so a failing query lands in the except below
+            # instead of surfacing as a truncated body after the 200 headers
+            rows = students.iterator(chunk_size=500)
+            first_row = next(rows, None)
+            return APIResponse.stream(chain([first_row], rows) if first_row is not None else [])
             
         except Exception as e:
-            logger.error(f"Error in get_students: {e}")
+            logger.exception("Error in get_students: %s", e)
             return APIResponse.error("Failed to retrieve students")
     
     def get_faculty_stats(self, request):
         """Get faculty statistics"""
         try:
+            cache_key = user_cache_key(request, 'faculty_stats')
+            stats_data = cache.get(cache_key)
+            if stats_data is not None:
+                return APIResponse.success(data=stats_data)
+            
             # Get question statistics
             question_stats = Question_DB.objects.filter(professor=request.user).aggregate(
-                total_questions=Count('id'),
-                active_questions=Count('id', filter=Q(is_active=True))
+                total_questions=Count('qno'),
+                active_questions=Count('qno', filter=Q(is_active=True))
             )
             
             # Get exam statistics
@@ -586,9 +779,11 @@ class FacultyAPIView(View):
                 active_exams=Count('id', filter=Q(is_active=True))
             )
             
-            # Get student statistics
-            student_stats = StudentInfo.objects.aggregate(
-                total_students=Count('id')
+            # Get student statistics (not user specific, so shared and kept longer)
+            student_stats = cache.get_or_set(
+                'api:student_stats',
+                lambda: StudentInfo.objects.aggregate(total_students=Count('id')),
+                GLOBAL_CACHE_TTL
             )
             
             stats_data = {
@@ -596,9 +791,10 @@ class FacultyAPIView(View):
                 'exams': exam_stats,
                 'students': student_stats
             }
+            cache.set(cache_key, stats_data, USER_CACHE_TTL)
             
             return APIResponse.success(data=stats_data)
             
         except Exception as e:
-            logger.error(f"Error in get_faculty_stats: {e}")
+            logger.exception("Error in get_faculty_stats: %s", e)
             return APIResponse.error("Failed to retrieve statistics")
@@ -15,6 +15,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'testserver', '*']
 
+# Domain used for links in outgoing emails; falls back to the request's host when unset
+SITE_DOMAIN = os.environ.get('SITE_DOMAIN')
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -40,6 +43,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.UserContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,6 +80,21 @@ DATABASES = {
 }
 
 
+# Shared cache. With REDIS_URL set, django-redis backs the cache and the rate limiter
+# switches to its atomic GCRA script; otherwise Django's local-memory cache is used.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -134,6 +153,9 @@ MESSAGE_TAGS = {
 MEDIA_ROOT = MEDIA_DIR
 MEDIA_URL = '/media/'
 
+# Uploads above 2MB are streamed to a temporary file instead of being held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -144,3 +166,8 @@ EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = os.environ.get('EMAIL_HOST_USER')
 EMAIL_PORT = 587
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
+
+# Outgoing mail is handed to Celery workers only when a broker is set explicitly;
+# sharing REDIS_URL would queue mail even when no worker is running
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL')
+CELERY_TASK_IGNORE_RESULT = True
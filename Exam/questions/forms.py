@@ -0,0 +1,52 @@
+from django import forms
+from django.forms import ModelForm
+from .models import Exam_Model
+from .question_models import Question_DB
+from .questionpaper_models import Question_Paper
+
+
+class QForm(ModelForm):
+    class Meta:
+        model = Question_DB
+        fields = '__all__'
+        exclude = ['qno', 'professor', 'is_active']
+        widgets = {
+            'question': forms.TextInput(attrs = {'class':'form-control'}),
+            'optionA': forms.TextInput(attrs = {'class':'form-control'}),
+            'optionB': forms.TextInput(attrs = {'class':'form-control'}),
+            'optionC': forms.TextInput(attrs = {'class':'form-control'}),
+            'optionD': forms.TextInput(attrs = {'class':'form-control'}),
+            'answer': forms.TextInput(attrs = {'class':'form-control'}),
+            'max_marks': forms.NumberInput(attrs = {'class':'form-control'}),
+        }
+
+
+class QPForm(ModelForm):
+    def __init__(self,professor,*args,**kwargs):
+        super (QPForm,self ).__init__(*args,**kwargs) 
+        self.fields['questions'].queryset = Question_DB.objects.filter(professor=professor)
+
+    class Meta:
+        model = Question_Paper
+        fields = '__all__'
+        exclude = ['professor', 'is_active']
+        widgets = {
+            'qPaperTitle': forms.TextInput(attrs = {'class':'form-control'})
+        }
+
+
+class ExamForm(ModelForm):
+    def __init__(self,professor,*args,**kwargs):
+        super (ExamForm,self ).__init__(*args,**kwargs) 
+        self.fields['question_paper'].queryset = Question_Paper.objects.filter(professor=professor)
+
+    class Meta:
+        model = Exam_Model
+        fields = '__all__'
+        exclude = ['professor']
+        widgets = {
+            'name': forms.TextInput(attrs = {'class':'form-control'}),
+            'total_marks' : forms.NumberInput(attrs = {'class':'form-control'}),
+            'start_time': forms.DateTimeInput(attrs = {'class':'form-control'}),
+            'end_time': forms.DateTimeInput(attrs = {'class':'form-control'})
+        }
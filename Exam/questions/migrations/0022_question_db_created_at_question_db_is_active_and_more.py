@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-15 01:11
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0021_auto_20251002_0142'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question_db',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='question_db',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='question_db',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='question_paper',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='question_paper',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='question_paper',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='question_db',
+            name='qno',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+        migrations.AddIndex(
+            model_name='question_db',
+            index=models.Index(fields=['professor', 'is_active', '-created_at'], name='qdb_prof_active_ct_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question_paper',
+            index=models.Index(fields=['professor', 'is_active', '-created_at'], name='qp_prof_active_ct_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-15 01:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0022_question_db_created_at_question_db_is_active_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='question_db',
+            name='qdb_prof_active_ct_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='question_paper',
+            name='qp_prof_active_ct_idx',
+        ),
+        migrations.AddIndex(
+            model_name='question_db',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['professor', '-created_at'], name='qdb_prof_active_partial'),
+        ),
+        migrations.AddIndex(
+            model_name='question_paper',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['professor', '-created_at'], name='qp_prof_active_partial'),
+        ),
+    ]
@@ -1,9 +1,7 @@
 from django.db import models
-from django.forms import ModelForm
 from django.contrib.auth.models import User
 from datetime import datetime
 from .questionpaper_models import Question_Paper
-from django import forms
 
 class Exam_Model(models.Model):
     professor = models.ForeignKey(User, limit_choices_to={'groups__name': "Professor"}, on_delete=models.CASCADE)
@@ -15,20 +13,3 @@ class Exam_Model(models.Model):
 
     def __str__(self):
         return self.name
-
-
-class ExamForm(ModelForm):
-    def __init__(self,professor,*args,**kwargs):
-        super (ExamForm,self ).__init__(*args,**kwargs) 
-        self.fields['question_paper'].queryset = Question_Paper.objects.filter(professor=professor)
-
-    class Meta:
-        model = Exam_Model
-        fields = '__all__'
-        exclude = ['professor']
-        widgets = {
-            'name': forms.TextInput(attrs = {'class':'form-control'}),
-            'total_marks' : forms.NumberInput(attrs = {'class':'form-control'}),
-            'start_time': forms.DateTimeInput(attrs = {'class':'form-control'}),
-            'end_time': forms.DateTimeInput(attrs = {'class':'form-control'})
-        }
\ No newline at end of file
@@ -1,45 +1,25 @@
 from django.db import models
-from django.forms import ModelForm
 from django.contrib.auth.models import User
-from django import forms
 
 class Question_DB(models.Model):
     professor = models.ForeignKey(User, limit_choices_to={'groups__name': "Professor"}, on_delete=models.CASCADE, null=True, db_index=True)
-    qno = models.AutoField(primary_key=True)
-    question = models.CharField(max_length=100, db_index=True)
+    qno = models.BigAutoField(primary_key=True)
+    question = models.CharField(max_length=100)
     optionA = models.CharField(max_length=100)
     optionB = models.CharField(max_length=100)
     optionC = models.CharField(max_length=100)
     optionD = models.CharField(max_length=100)
-    answer = models.CharField(max_length=200, db_index=True)
-    max_marks = models.IntegerField(default=0, db_index=True)
-    # created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    # updated_at = models.DateTimeField(auto_now=True)
-    # is_active = models.BooleanField(default=True, db_index=True)
+    answer = models.CharField(max_length=200)
+    max_marks = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    is_active = models.BooleanField(default=True)
 
     def __str__(self):
         return f'Question No.{self.qno}: {self.question} \t\t Options: \nA. {self.optionA} \nB.{self.optionB} \nC.{self.optionC} \nD.{self.optionD} '
     
     class Meta:
         indexes = [
-            # models.Index(fields=['professor', 'is_active']),
-            # models.Index(fields=['professor', 'created_at']),
-            models.Index(fields=['max_marks']),
-            # models.Index(fields=['created_at']),
+            # Matches the faculty question listing: active rows only, by professor, newest first
+            models.Index(fields=['professor', '-created_at'], condition=models.Q(is_active=True), name='qdb_prof_active_partial'),
         ]
-
-
-class QForm(ModelForm):
-    class Meta:
-        model = Question_DB
-        fields = '__all__'
-        exclude = ['qno', 'professor']
-        widgets = {
-            'question': forms.TextInput(attrs = {'class':'form-control'}),
-            'optionA': forms.TextInput(attrs = {'class':'form-control'}),
-            'optionB': forms.TextInput(attrs = {'class':'form-control'}),
-            'optionC': forms.TextInput(attrs = {'class':'form-control'}),
-            'optionD': forms.TextInput(attrs = {'class':'form-control'}),
-            'answer': forms.TextInput(attrs = {'class':'form-control'}),
-            'max_marks': forms.NumberInput(attrs = {'class':'form-control'}),
-        }
\ No newline at end of file
@@ -5,8 +5,7 @@ from django.contrib.auth.models import Group
 from student.models import *
 from django.utils import timezone
 from student.models import StuExam_DB,StuResults_DB
-from questions.questionpaper_models import QPForm
-from questions.question_models import QForm
+from .forms import QForm, QPForm, ExamForm
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 
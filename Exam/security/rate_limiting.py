@@ -2,93 +2,294 @@
 Rate limiting and security enhancements for the exam portal
 """
 from django.core.cache import cache
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+import ipaddress
+import json
+import math
+import re
+import threading
 import time
 import hashlib
 import logging
 
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
 logger = logging.getLogger(__name__)
 
-class RateLimitMiddleware(MiddlewareMixin):
-    """
-    Rate limiting middleware to prevent abuse
-    """
-    
-    def __init__(self, get_response):
-        self.get_response = get_response
-        # Rate limits (requests per minute)
-        self.rate_limits = {
-            'login': 5,  # 5 login attempts per minute
-            'register': 3,  # 3 registration attempts per minute
-            'exam_submit': 10,  # 10 exam submissions per minute
-            'api': 60,  # 60 API calls per minute
-            'default': 100,  # 100 requests per minute for other endpoints
-        }
-        super().__init__(get_response)
-    
-    def get_client_ip(self, request):
-        """Get client IP address"""
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'remaining', 'retry_after'])
+
+# Length of a rate-limit window in seconds; the configured limits are per window
+RATE_LIMIT_WINDOW = 60
+# Sub-buckets per window for the sliding-window fallback
+RATE_LIMIT_BUCKETS = 6
+
+# Generic Cell Rate Algorithm: the key holds the client's theoretical arrival time
+# (ms). Each request pushes it forward by one emission interval and is refused once
+# it would run more than a full window ahead of now. Runs atomically in one round-trip.
+# ARGV: emission interval (ms), window (ms), now (ms), cost
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local ahead = new_tat - now
+if ahead > window then
+    return {0, 0, math.ceil(ahead - window)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(ahead))
+return {1, math.floor((window - ahead) / emission), 0}
+"""
+
+_gcra_script = None
+
+# Rate limits (requests per minute)
+RATE_LIMITS = {
+    'login': 5,  # 5 login attempts per minute
+    'register': 3,  # 3 registration attempts per minute
+    'exam_submit': 10,  # 10 exam submissions per minute
+    'api': 60,  # 60 API calls per minute
+    'default': 100,  # 100 requests per minute for other endpoints
+}
+
+# Per-process record of clients already over their limit, so a client that keeps
+# hammering is refused until its retry time without another cache round-trip.
+# Maps the rate-limit key to the deny-until timestamp; oldest entries sit at the front.
+DENIED_CACHE_MAX_ENTRIES = 10000
+_denied_counters = OrderedDict()
+_denied_counters_lock = threading.Lock()
+
+
+# Automation markers in User-Agent strings that should never appear during an exam
+SUSPICIOUS_USER_AGENT_RE = re.compile(r'headless|bot|phantom|selenium|puppeteer', re.IGNORECASE)
+
+
+# Error bodies are serialized once at import; blocked requests are the hot path under attack
+SUSPICIOUS_ACTIVITY_BODY = json.dumps({
+    'error': 'Suspicious activity detected. Exam submission blocked.',
+    'code': 'SECURITY_VIOLATION'
+}).encode()
+SECURITY_VIOLATION_BODY = json.dumps({
+    'error': 'Security violation detected. Action blocked.',
+    'code': 'SECURITY_VIOLATION'
+}).encode()
+IP_NOT_WHITELISTED_BODY = json.dumps({
+    'error': 'Access denied. IP not whitelisted.',
+    'code': 'IP_NOT_WHITELISTED'
+}).encode()
+
+
+@lru_cache(maxsize=128)
+def rate_limit_body(retry_after):
+    """429 body for a given retry_after, which never exceeds the window length"""
+    return json.dumps({
+        'error': 'Rate limit exceeded. Please try again later.',
+        'retry_after': retry_after
+    }).encode()
+
+
+def json_error_response(body, status):
+    """Wrap a prebuilt JSON body in a fresh response"""
+    return HttpResponse(body, status=status, content_type='application/json')
+
+
+def rate_limit_response(retry_after):
+    """Build the 429 response from its cached body"""
+    return json_error_response(rate_limit_body(retry_after), 429)
+
+
+def get_client_ip(request):
+    """Get client IP address, parsed once per request and kept on the request"""
+    ip = getattr(request, '_client_ip', None)
+    if ip is None:
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
             ip = x_forwarded_for.split(',')[0]
         else:
             ip = request.META.get('REMOTE_ADDR')
-        return ip
+        request._client_ip = ip
+    return ip
+
+
+def request_time(request):
+    """
+    Return the timestamp taken when the request entered the middleware stack,
+    reading the clock only if no earlier middleware has stamped it
+    """
+    now = getattr(request, '_now', None)
+    if now is None:
+        now = request._now = time.time()
+    return now
+
+
+def get_gcra_script():
+    """
+    Return the registered GCRA script when the default cache is django-redis,
+    or None so callers fall back to the portable sliding-window counter
+    """
+    global _gcra_script
+    if _gcra_script is None:
+        if get_redis_connection is None or settings.CACHES['default']['BACKEND'] != 'django_redis.cache.RedisCache':
+            return None
+        _gcra_script = get_redis_connection('default').register_script(GCRA_SCRIPT)
+    return _gcra_script
+
+
+def remember_denied(key, until, now):
+    """Record a client as denied until the given time, dropping expired entries first"""
+    with _denied_counters_lock:
+        while _denied_counters:
+            oldest_until = next(iter(_denied_counters.values()))
+            if oldest_until > now and len(_denied_counters) < DENIED_CACHE_MAX_ENTRIES:
+                break
+            _denied_counters.popitem(last=False)
+        _denied_counters[key] = until
+        _denied_counters.move_to_end(key)
+
+
+def get_rate_limit_key(request, endpoint_type='default'):
+    """Generate rate limit key for caching"""
+    ip = get_client_ip(request)
+    # The middleware runs before authentication, so request.user may not exist yet
+    user_id = getattr(getattr(request, 'user', None), 'id', 'anonymous')
+    return f"rate_limit:{endpoint_type}:{ip}:{user_id}"
+
+
+def get_endpoint_type(request):
+    """Determine endpoint type for rate limiting"""
+    path = request.path
     
-    def get_rate_limit_key(self, request, endpoint_type='default'):
-        """Generate rate limit key for caching"""
-        ip = self.get_client_ip(request)
-        user_id = getattr(request.user, 'id', 'anonymous')
-        return f"rate_limit:{endpoint_type}:{ip}:{user_id}"
+    if 'login' in path:
+        return 'login'
+    elif 'register' in path:
+        return 'register'
+    elif 'submit' in path or 'exam' in path:
+        return 'exam_submit'
+    elif 'api' in path:
+        return 'api'
+    else:
+        return 'default'
+
+
+def check_rate_limit(request, endpoint_type='default', rate_limit=None):
+    """Count this request against its limit and return a RateLimitResult"""
+    key = get_rate_limit_key(request, endpoint_type)
+    now = request_time(request)
     
-    def is_rate_limited(self, request, endpoint_type='default'):
-        """Check if request is rate limited"""
-        key = self.get_rate_limit_key(request, endpoint_type)
-        current_time = int(time.time())
-        minute = current_time // 60
-        
-        # Get current count for this minute
-        cache_key = f"{key}:{minute}"
-        current_count = cache.get(cache_key, 0)
-        
-        # Get rate limit for this endpoint type
-        rate_limit = self.rate_limits.get(endpoint_type, self.rate_limits['default'])
-        
-        if current_count >= rate_limit:
-            return True
-        
-        # Increment counter
-        cache.set(cache_key, current_count + 1, 60)  # Expire after 1 minute
-        return False
+    denied_until = _denied_counters.get(key)
+    if denied_until is not None and denied_until > now:
+        return RateLimitResult(False, 0, math.ceil(denied_until - now))
     
-    def get_endpoint_type(self, request):
-        """Determine endpoint type for rate limiting"""
-        path = request.path
-        
-        if 'login' in path:
-            return 'login'
-        elif 'register' in path:
-            return 'register'
-        elif 'submit' in path or 'exam' in path:
-            return 'exam_submit'
-        elif 'api' in path:
-            return 'api'
-        else:
-            return 'default'
+    # Get rate limit for this endpoint type
+    if rate_limit is None:
+        rate_limit = RATE_LIMITS.get(endpoint_type, RATE_LIMITS['default'])
+    
+    script = get_gcra_script()
+    if script is not None:
+        allowed, remaining, retry_after_ms = script(
+            keys=[f"{key}:gcra"],
+            args=[RATE_LIMIT_WINDOW * 1000 / rate_limit, RATE_LIMIT_WINDOW * 1000, int(now * 1000), 1]
+        )
+        result = RateLimitResult(bool(allowed), remaining, math.ceil(retry_after_ms / 1000))
+    else:
+        result = check_sliding_window(key, now, rate_limit)
+    
+    if not result.allowed:
+        remember_denied(key, now + result.retry_after, now)
+    return result
+
+
+def is_rate_limited(request, endpoint_type='default', rate_limit=None):
+    """Check if request is rate limited"""
+    return not check_rate_limit(request, endpoint_type, rate_limit).allowed
+
+
+def check_sliding_window(key, now, rate_limit):
+    """
+    Sliding-window counter used when the cache backend cannot run the GCRA script.
+    The window is split into RATE_LIMIT_BUCKETS sub-buckets; only the current one
+    is incremented and the whole window is summed, so a client cannot double its
+    allowance by straddling a window boundary.
+    """
+    bucket_length = RATE_LIMIT_WINDOW // RATE_LIMIT_BUCKETS
+    current_bucket = int(now) // bucket_length
+    previous_keys = [f"{key}:{bucket}" for bucket in range(current_bucket - RATE_LIMIT_BUCKETS + 1, current_bucket)]
+    cache_key = f"{key}:{current_bucket}"
+    bucket_ttl = RATE_LIMIT_WINDOW + bucket_length
+    
+    # Count this request atomically so concurrent workers cannot under-count
+    cache.add(cache_key, 0, bucket_ttl)
+    try:
+        current_count = cache.incr(cache_key)
+    except ValueError:
+        # The counter expired between add() and incr(); start a fresh one
+        cache.set(cache_key, 1, bucket_ttl)
+        current_count = 1
+    
+    previous_counts = cache.get_many(previous_keys)
+    window_count = current_count + sum(previous_counts.values())
+    
+    if window_count > rate_limit:
+        # Retry once the oldest counted bucket slides out of the window
+        oldest_key = next((bucket_key for bucket_key in previous_keys if previous_counts.get(bucket_key)), cache_key)
+        oldest_bucket = int(oldest_key.rsplit(':', 1)[1])
+        retry_after = math.ceil((oldest_bucket + RATE_LIMIT_BUCKETS) * bucket_length - now)
+        return RateLimitResult(False, 0, max(retry_after, 1))
+    return RateLimitResult(True, rate_limit - window_count, 0)
+
+
+def detect_suspicious_activity(request):
+    """
+    Detect suspicious activity during exams. The verdict is kept on the request,
+    so the middleware and the view decorator do not count one submission twice.
+    """
+    suspicious = getattr(request, '_suspicious_activity', None)
+    if suspicious is None:
+        suspicious = request._suspicious_activity = _detect_suspicious_activity(request)
+    return suspicious
+
+
+def _detect_suspicious_activity(request):
+    # Check for rapid submissions (less than 1 second between requests). The key
+    # acts as a one-second debounce token: add() only succeeds once it has expired.
+    ip = get_client_ip(request)
+    if not cache.add(f"exam_submit_lock:{ip}", 1, 1):
+        return True
+    
+    # Check for multiple tabs/windows (basic detection)
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if SUSPICIOUS_USER_AGENT_RE.search(user_agent):
+        return True
+    
+    return False
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """
+    Rate limiting middleware to prevent abuse
+    """
     
     def process_request(self, request):
         """Process request for rate limiting"""
+        request._now = time.time()
         if request.method in ['POST', 'PUT', 'DELETE']:
-            endpoint_type = self.get_endpoint_type(request)
+            endpoint_type = get_endpoint_type(request)
             
-            if self.is_rate_limited(request, endpoint_type):
-                logger.warning(f"Rate limit exceeded for {self.get_client_ip(request)} on {request.path}")
-                return JsonResponse({
-                    'error': 'Rate limit exceeded. Please try again later.',
-                    'retry_after': 60
-                }, status=429)
+            result = check_rate_limit(request, endpoint_type)
+            if not result.allowed:
+                logger.warning(f"Rate limit exceeded for {get_client_ip(request)} on {request.path}")
+                return rate_limit_response(result.retry_after)
         
         return None
 
@@ -147,45 +348,11 @@ class ExamSecurityMiddleware(MiddlewareMixin):
         """Check for exam security violations"""
         if 'exam' in request.path and request.method == 'POST':
             # Check for suspicious activity
-            if self.detect_suspicious_activity(request):
-                logger.warning(f"Suspicious activity detected from {self.get_client_ip(request)}")
-                return JsonResponse({
-                    'error': 'Suspicious activity detected. Exam submission blocked.',
-                    'code': 'SECURITY_VIOLATION'
-                }, status=403)
+            if detect_suspicious_activity(request):
+                logger.warning(f"Suspicious activity detected from {get_client_ip(request)}")
+                return json_error_response(SUSPICIOUS_ACTIVITY_BODY, 403)
         
         return None
-    
-    def get_client_ip(self, request):
-        """Get client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
-    def detect_suspicious_activity(self, request):
-        """Detect suspicious activity during exams"""
-        # Check for rapid submissions (less than 1 second between requests)
-        ip = self.get_client_ip(request)
-        cache_key = f"exam_submission:{ip}"
-        last_submission = cache.get(cache_key)
-        
-        if last_submission:
-            time_diff = time.time() - last_submission
-            if time_diff < 1:  # Less than 1 second
-                return True
-        
-        # Store current submission time
-        cache.set(cache_key, time.time(), 300)  # 5 minutes
-        
-        # Check for multiple tabs/windows (basic detection)
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        if 'headless' in user_agent.lower() or 'bot' in user_agent.lower():
-            return True
-        
-        return False
 
 
 def rate_limit_decorator(endpoint_type='default', rate_limit=None):
@@ -194,16 +361,9 @@ def rate_limit_decorator(endpoint_type='default', rate_limit=None):
     """
     def decorator(view_func):
         def wrapper(request, *args, **kwargs):
-            # Get rate limit for this endpoint
-            limit = rate_limit or RateLimitMiddleware.rate_limits.get(endpoint_type, 100)
-            
-            # Check rate limit
-            middleware = RateLimitMiddleware(None)
-            if middleware.is_rate_limited(request, endpoint_type):
-                return JsonResponse({
-                    'error': 'Rate limit exceeded. Please try again later.',
-                    'retry_after': 60
-                }, status=429)
+            result = check_rate_limit(request, endpoint_type, rate_limit)
+            if not result.allowed:
+                return rate_limit_response(result.retry_after)
             
             return view_func(request, *args, **kwargs)
         return wrapper
@@ -217,13 +377,9 @@ def exam_security_check(view_func):
     def wrapper(request, *args, **kwargs):
         if request.method == 'POST' and 'exam' in request.path:
             # Check for suspicious activity
-            middleware = ExamSecurityMiddleware(None)
-            if middleware.detect_suspicious_activity(request):
-                logger.warning(f"Exam security violation from {middleware.get_client_ip(request)}")
-                return JsonResponse({
-                    'error': 'Security violation detected. Action blocked.',
-                    'code': 'SECURITY_VIOLATION'
-                }, status=403)
+            if detect_suspicious_activity(request):
+                logger.warning(f"Exam security violation from {get_client_ip(request)}")
+                return json_error_response(SECURITY_VIOLATION_BODY, 403)
         
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -236,32 +392,37 @@ class IPWhitelistMiddleware(MiddlewareMixin):
     
     def __init__(self, get_response):
         self.get_response = get_response
-        # Add trusted IPs here
-        self.whitelisted_ips = getattr(settings, 'TRUSTED_IPS', [
+        # Add trusted IPs here; exact addresses are checked with a set lookup
+        self.whitelisted_ips = frozenset(getattr(settings, 'TRUSTED_IPS', [
             '127.0.0.1',
             '::1',
             'localhost'
-        ])
+        ]))
+        # Trusted ranges in CIDR notation, parsed once
+        self.whitelisted_networks = [
+            ipaddress.ip_network(network, strict=False)
+            for network in getattr(settings, 'TRUSTED_IP_NETS', [])
+        ]
         super().__init__(get_response)
     
-    def get_client_ip(self, request):
-        """Get client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+    def is_whitelisted(self, ip):
+        """Check an address against the trusted IPs and networks"""
+        if ip in self.whitelisted_ips:
+            return True
+        if not self.whitelisted_networks or not ip:
+            return False
+        try:
+            address = ipaddress.ip_address(ip.strip())
+        except ValueError:
+            return False
+        return any(address in network for network in self.whitelisted_networks)
     
     def process_request(self, request):
         """Check IP whitelist for admin access"""
         if request.path.startswith('/admin/'):
-            ip = self.get_client_ip(request)
-            if ip not in self.whitelisted_ips:
+            ip = get_client_ip(request)
+            if not self.is_whitelisted(ip):
                 logger.warning(f"Unauthorized admin access attempt from {ip}")
-                return JsonResponse({
-                    'error': 'Access denied. IP not whitelisted.',
-                    'code': 'IP_NOT_WHITELISTED'
-                }, status=403)
+                return json_error_response(IP_NOT_WHITELISTED_BODY, 403)
         
         return None
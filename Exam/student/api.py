@@ -3,8 +3,7 @@ from django.contrib.auth.models import User
 from django.http import JsonResponse
 import json
 from validate_email import validate_email
-from .views import EmailThread
-from django.core.mail import EmailMessage
+from .tasks import queue_email
 
 class UsernameValidation(View):
     def post(self,request):
@@ -38,12 +37,5 @@ class Cheating(View):
 		email = User.objects.get(username=professorname).email
 		email_subject = 'Student Cheating'
 		email_body = 'Student caught changing window for 5 times. Student username is :' + student
-		fromEmail = 'noreply@exam.com'
-		email_obj = EmailMessage(
-		    email_subject,
-		    email_body,
-            fromEmail,
-		    [email],
-		)
-		EmailThread(email_obj).start()
+		queue_email(email_subject, email_body, [email])
 		return JsonResponse({'sent':True})
\ No newline at end of file
@@ -0,0 +1,39 @@
+"""
+Reusable SMTP connections for outgoing mail.
+
+Each thread keeps its own lazily opened connection and reuses it across
+messages, so consecutive emails skip the EHLO/STARTTLS/AUTH handshake.
+Connections are per thread rather than shared so the email pool's
+workers send in parallel instead of queueing on one connection's lock.
+"""
+import threading
+from smtplib import SMTPServerDisconnected
+
+from django.core import mail
+
+_local = threading.local()
+
+
+def get_thread_connection():
+    connection = getattr(_local, 'connection', None)
+    if connection is None:
+        connection = mail.get_connection()
+        connection.open()
+        _local.connection = connection
+    return connection
+
+
+def reset_thread_connection():
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        connection.close()
+        _local.connection = None
+
+
+def send_messages(email_messages):
+    """Send a batch over this thread's connection, reconnecting once if the server hung up."""
+    try:
+        return get_thread_connection().send_messages(email_messages)
+    except (SMTPServerDisconnected, ConnectionError):
+        reset_thread_connection()
+        return get_thread_connection().send_messages(email_messages)
@@ -1,6 +1,8 @@
 from django import forms
 from .models import StudentInfo
 from django.contrib.auth.models import User
+from django.contrib.auth import password_validation
+from django.core.exceptions import ValidationError
 
 class StudentForm(forms.ModelForm):
     
@@ -13,6 +15,16 @@ class StudentForm(forms.ModelForm):
             'username' : forms.TextInput(attrs = {'id':'usernamefield','class':'form-control'})
         }
 
+    def _post_clean(self):
+        super()._post_clean()
+        # Validate once the instance carries username/email, so the similarity check has them
+        password = self.cleaned_data.get('password')
+        if password:
+            try:
+                password_validation.validate_password(password, self.instance)
+            except ValidationError as error:
+                self.add_error('password', error)
+
 class StudentInfoForm(forms.ModelForm):
     class Meta():
         model = StudentInfo
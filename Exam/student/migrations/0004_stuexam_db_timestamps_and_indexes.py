@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-15 01:21
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0023_question_partial_active_indexes'),
+        ('student', '0003_alter_studentinfo_id_alter_stuexam_db_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stu_question',
+            name='answered_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='stuexam_db',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='stuexam_db',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='stu_question',
+            name='choice',
+            field=models.CharField(db_index=True, default='E', max_length=3),
+        ),
+        migrations.AlterField(
+            model_name='studentinfo',
+            name='stream',
+            field=models.CharField(blank=True, db_index=True, max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='stuexam_db',
+            name='completed',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='stuexam_db',
+            name='examname',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='stuexam_db',
+            name='score',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AddIndex(
+            model_name='stu_question',
+            index=models.Index(fields=['student', 'choice'], name='student_stu_student_1a42c0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stu_question',
+            index=models.Index(fields=['answered_at'], name='student_stu_answere_7df33e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentinfo',
+            index=models.Index(fields=['user', 'stream'], name='student_stu_user_id_ef4282_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stuexam_db',
+            index=models.Index(fields=['student', 'examname'], name='student_stu_student_3fe73f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stuexam_db',
+            index=models.Index(fields=['student', 'score'], name='student_stu_student_66fb54_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stuexam_db',
+            index=models.Index(fields=['examname', 'completed'], name='student_stu_examnam_8153b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stuexam_db',
+            index=models.Index(fields=['student', '-created_at'], name='stuexam_student_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Fail with a readable list instead of a bare IntegrityError from CREATE UNIQUE INDEX."""
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='')
+        .values(email_lower=Lower('email'))
+        .annotate(accounts=Count('id'))
+        .filter(accounts__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    if not duplicates:
+        return
+    
+    lines = []
+    for email in sorted(duplicates):
+        usernames = User.objects.alias(email_lower=Lower('email')).filter(
+            email_lower=email
+        ).order_by('username').values_list('username', flat=True)
+        lines.append(f"  {email}: {', '.join(usernames)}")
+    raise RuntimeError(
+        "Cannot add the case-insensitive unique index on auth_user.email; "
+        "these emails are shared by several accounts:\n" + "\n".join(lines) + "\n"
+        "Give each account a distinct email (or clear the unused ones) and run migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('student', '0004_stuexam_db_timestamps_and_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        # Case-insensitive uniqueness for non-empty emails; admin-created users may leave it blank
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX auth_user_email_uniq ON auth_user (lower(email)) WHERE email <> '';",
+            reverse_sql="DROP INDEX auth_user_email_uniq;",
+        ),
+    ]
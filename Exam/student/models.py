@@ -44,8 +44,8 @@ class StuExam_DB(models.Model):
     questions = models.ManyToManyField(Stu_Question)
     score = models.IntegerField(default=0, db_index=True)
     completed = models.IntegerField(default=0, db_index=True)
-    # created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    # updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return str(self.student.username) +" " + str(self.examname) + " " + str(self.qpaper.qPaperTitle) + "-StuExam_DB"
@@ -55,7 +55,8 @@ class StuExam_DB(models.Model):
             models.Index(fields=['student', 'examname']),
             models.Index(fields=['student', 'score']),
             models.Index(fields=['examname', 'completed']),
-            # models.Index(fields=['created_at']),
+            # Serves filter(student=...).order_by('-created_at') without a sort step
+            models.Index(fields=['student', '-created_at'], name='stuexam_student_recent_idx'),
         ]
 
 
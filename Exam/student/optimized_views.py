@@ -4,56 +4,117 @@ Optimized views with better database queries and performance improvements
 from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib.auth.decorators import login_required
+from django.contrib import messages
 from django.contrib.auth.models import User
-from django.db.models import Prefetch, Count, Avg, Q
+from django.db.models import Prefetch, Count, Avg, Sum, Max, Q, F, Value, Case, When, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Left, StrIndex
 from django.core.paginator import Paginator
 from django.http import JsonResponse
-from django.views.decorators.cache import cache_page
+from django.core.cache import cache
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import never_cache
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.http import condition
 from django.views.decorators.csrf import csrf_protect
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
+import hashlib
 import logging
 
 from .models import StudentInfo, StuExam_DB, StuResults_DB, Stu_Question
+from .signals import dashboard_stats_cache_key
 from questions.question_models import Question_DB
 from questions.questionpaper_models import Question_Paper
 
 logger = logging.getLogger(__name__)
 
-@method_decorator([csrf_protect, never_cache], name='dispatch')
+# Most exams the dashboard reads for a student in one go
+DASHBOARD_EXAM_LIMIT = 100
+
+
+def summarize_exams(exams):
+    """Compute the dashboard exam statistics from already-loaded exam rows"""
+    scores = [exam['score'] for exam in exams]
+    return {
+        'total_exams': len(exams),
+        'completed_exams': sum(1 for exam in exams if exam['completed'] == 1),
+        'avg_score': sum(scores) / len(scores) if scores else None,
+        'total_score': sum(1 for score in scores if score > 0),
+    }
+
+
+def dashboard_validators(request):
+    """
+    ETag and Last-Modified for a student's dashboard, computed once per request
+    from one indexed aggregate over their exams. The ETag also covers the user
+    and CSRF secret rendered into the page; pending flash messages disable
+    both validators so they are never swallowed by a 304.
+    """
+    if not hasattr(request, '_dashboard_validators'):
+        if not request.user.is_authenticated or len(messages.get_messages(request)):
+            request._dashboard_validators = (None, None)
+        else:
+            state = StuExam_DB.objects.filter(student=request.user).aggregate(
+                latest=Max('updated_at'),
+                total=Count('id')
+            )
+            fingerprint = ':'.join(str(part) for part in (
+                request.user.pk,
+                request.user.username,
+                request.META.get('CSRF_COOKIE', ''),
+                state['latest'],
+                state['total'],
+            ))
+            etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+            request._dashboard_validators = (etag, state['latest'])
+    return request._dashboard_validators
+
+
+# Browsers may keep the page but must revalidate it, which makes the conditional GET useful
+@method_decorator([csrf_protect, cache_control(private=True, no_cache=True, must_revalidate=True)], name='dispatch')
 class OptimizedStudentDashboard(View):
     """
     Optimized student dashboard with efficient database queries
     """
     
-    @method_decorator(cache_page(60 * 5))  # Cache for 5 minutes
+    @method_decorator(condition(
+        etag_func=lambda request: dashboard_validators(request)[0],
+        last_modified_func=lambda request: dashboard_validators(request)[1]
+    ))
     def get(self, request):
         try:
-            # Get student info with select_related to avoid N+1 queries
-            student_info = StudentInfo.objects.select_related('user').get(user=request.user)
+            # The template reads the user from request.user, so no join is needed; the
+            # reverse accessor also caches request.user on the profile
+            student_info = request.user.studentinfo
             
-            # Optimized exam queries with prefetch_related
-            student_exams = StuExam_DB.objects.filter(
-                student=request.user
-            ).select_related('qpaper', 'qpaper__professor').prefetch_related(
-                'questions'
-            ).order_by('-created_at')
+            # One capped read of the student's exams, newest first, serves every panel
+            student_exams = StuExam_DB.objects.filter(student=request.user)
+            all_exams = list(student_exams.order_by('-created_at').values(
+                'id', 'examname', 'score', 'completed', 'created_at', 'qpaper__qPaperTitle'
+            )[:DASHBOARD_EXAM_LIMIT])
+            
+            # Get exam statistics, cached per student until an exam changes. The rows
+            # already read cover every exam unless the cap was hit.
+            def compute_exam_stats():
+                if len(all_exams) < DASHBOARD_EXAM_LIMIT:
+                    return summarize_exams(all_exams)
+                return student_exams.aggregate(
+                    total_exams=Count('id'),
+                    completed_exams=Count('id', filter=Q(completed=1)),
+                    avg_score=Avg('score'),
+                    total_score=Count('score', filter=Q(score__gt=0))
+                )
             
-            # Get exam statistics efficiently
-            exam_stats = student_exams.aggregate(
-                total_exams=Count('id'),
-                completed_exams=Count('id', filter=Q(completed=1)),
-                avg_score=Avg('score'),
-                total_score=Count('score', filter=Q(score__gt=0))
+            exam_stats = cache.get_or_set(
+                dashboard_stats_cache_key(request.user.id),
+                compute_exam_stats,
+                60 * 5  # Cache for 5 minutes
             )
             
-            # Get recent activity with optimized queries
-            recent_activities = student_exams[:5]
+            # Get recent activity
+            recent_activities = all_exams[:5]
             
             # Get upcoming exams (not completed)
-            upcoming_exams = student_exams.filter(completed=0)[:3]
+            upcoming_exams = [exam for exam in all_exams if not exam['completed']][:3]
             
             # Get practice tests (sample data for now)
             practice_tests = [
@@ -105,11 +166,11 @@ class OptimizedStudentDashboard(View):
             return render(request, 'student/index.html', context)
             
         except StudentInfo.DoesNotExist:
-            logger.warning(f"StudentInfo not found for user {request.user.username}")
+            logger.warning("StudentInfo not found for user %s", request.user.username)
             messages.error(request, "Student profile not found. Please contact support.")
             return redirect('login')
         except Exception as e:
-            logger.error(f"Error in OptimizedStudentDashboard: {e}")
+            logger.exception("Error in OptimizedStudentDashboard: %s", e)
             messages.error(request, "An error occurred while loading the dashboard.")
             return redirect('login')
 
@@ -122,14 +183,19 @@ class OptimizedExamList(View):
     
     def get(self, request):
         try:
+            # Sum each paper's marks in a correlated subquery so the listing joins questions only once
+            paper_marks = Question_Paper.questions.through.objects.filter(
+                question_paper=OuterRef('pk')
+            ).values('question_paper').annotate(
+                marks=Sum('question_db__max_marks')
+            ).values('marks')
+            
             # Get available exams with optimized queries
             exams = Question_Paper.objects.filter(
                 is_active=True
-            ).select_related('professor').prefetch_related(
-                'questions'
-            ).annotate(
-                question_count=Count('questions'),
-                total_marks=Count('questions__max_marks')
+            ).select_related('professor').annotate(
+                question_count=Count('questions', distinct=True),
+                total_marks=Coalesce(Subquery(paper_marks), 0)
             ).order_by('-created_at')
             
             # Add pagination
@@ -151,7 +217,7 @@ class OptimizedExamList(View):
             return render(request, 'exam/mainexamstudent.html', context)
             
         except Exception as e:
-            logger.error(f"Error in OptimizedExamList: {e}")
+            logger.exception("Error in OptimizedExamList: %s", e)
             messages.error(request, "An error occurred while loading exams.")
             return redirect('student-index')
 
@@ -164,13 +230,8 @@ class OptimizedResultsView(View):
     
     def get(self, request):
         try:
-            # Get student's exam results with optimized queries
-            student_results = StuResults_DB.objects.filter(
-                student=request.user
-            ).prefetch_related(
-                'exams__qpaper',
-                'exams__questions'
-            ).first()
+            # Get student's exam results
+            student_results = StuResults_DB.objects.filter(student=request.user).first()
             
             if not student_results:
                 # Return empty results with sample data
@@ -180,20 +241,27 @@ class OptimizedResultsView(View):
                 }
                 return render(request, 'exam/resultsstudent.html', context)
             
-            # Aggregate results efficiently
-            exam_data = {}
-            for exam in student_results.exams.all():
-                exam_data[exam.examname] = {
-                    'score': exam.score,
-                    'completed': exam.completed,
-                    'qpaper_title': exam.qpaper.qPaperTitle if exam.qpaper else 'N/A',
-                    'created_at': exam.created_at
+            # Read plain rows and aggregate in SQL rather than materializing exam objects
+            results_exams = StuExam_DB.objects.filter(sturesults_db=student_results)
+            exam_data = {
+                exam['examname']: {
+                    'score': exam['score'],
+                    'completed': exam['completed'],
+                    'qpaper_title': exam['qpaper__qPaperTitle'] or 'N/A',
+                    'created_at': exam['created_at']
                 }
+                for exam in results_exams.values('examname', 'score', 'completed', 'qpaper__qPaperTitle', 'created_at')
+            }
             
             # Calculate performance statistics
-            total_exams = len(exam_data)
-            completed_exams = sum(1 for data in exam_data.values() if data['completed'])
-            avg_score = sum(data['score'] for data in exam_data.values()) / total_exams if total_exams > 0 else 0
+            exam_totals = results_exams.aggregate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(completed=1)),
+                avg_score=Avg('score')
+            )
+            total_exams = exam_totals['total']
+            completed_exams = exam_totals['completed']
+            avg_score = exam_totals['avg_score'] or 0
             
             context = {
                 'students': exam_data,
@@ -209,7 +277,7 @@ class OptimizedResultsView(View):
             return render(request, 'exam/resultsstudent.html', context)
             
         except Exception as e:
-            logger.error(f"Error in OptimizedResultsView: {e}")
+            logger.exception("Error in OptimizedResultsView: %s", e)
             messages.error(request, "An error occurred while loading results.")
             return redirect('student-index')
 
@@ -222,15 +290,13 @@ class OptimizedAPIView(View):
     def get(self, request, endpoint):
         try:
             if endpoint == 'stats':
-                # Get student statistics efficiently
-                student_exams = StuExam_DB.objects.filter(student=request.user)
-                
-                stats = {
-                    'total_exams': student_exams.count(),
-                    'completed_exams': student_exams.filter(completed=1).count(),
-                    'avg_score': student_exams.aggregate(avg_score=Avg('score'))['avg_score'] or 0,
-                    'total_questions': Stu_Question.objects.filter(student=request.user).count(),
-                }
+                # Count, completion and average in a single aggregate pass
+                stats = StuExam_DB.objects.filter(student=request.user).aggregate(
+                    total_exams=Count('id'),
+                    completed_exams=Count('id', filter=Q(completed=1)),
+                    avg_score=Coalesce(Avg('score'), 0.0),
+                )
+                stats['total_questions'] = Stu_Question.objects.filter(student=request.user).count()
                 
                 return JsonResponse({
                     'success': True,
@@ -266,7 +332,7 @@ class OptimizedAPIView(View):
                 }, status=400)
                 
         except Exception as e:
-            logger.error(f"Error in OptimizedAPIView: {e}")
+            logger.exception("Error in OptimizedAPIView: %s", e)
             return JsonResponse({
                 'success': False,
                 'error': 'Internal server error'
@@ -301,7 +367,7 @@ class OptimizedAPIView(View):
                 }, status=400)
                 
         except Exception as e:
-            logger.error(f"Error in OptimizedAPIView POST: {e}")
+            logger.exception("Error in OptimizedAPIView POST: %s", e)
             return JsonResponse({
                 'success': False,
                 'error': 'Internal server error'
@@ -315,13 +381,13 @@ def get_optimized_question_list(exam_id):
     try:
         # Get questions with optimized queries
         questions = Question_DB.objects.filter(
-            questionpaper__id=exam_id,
+            question_paper=exam_id,
             is_active=True
-        ).select_related('professor').order_by('qno')
+        ).order_by('qno')
         
         return questions
     except Exception as e:
-        logger.error(f"Error in get_optimized_question_list: {e}")
+        logger.exception("Error in get_optimized_question_list: %s", e)
         return Question_DB.objects.none()
 
 
@@ -330,30 +396,29 @@ def get_student_performance_stats(student_id):
     Get comprehensive performance statistics for a student
     """
     try:
-        # Get all student exams with optimized queries
-        student_exams = StuExam_DB.objects.filter(
-            student_id=student_id
-        ).select_related('qpaper').prefetch_related('questions')
+        student_exams = StuExam_DB.objects.filter(student_id=student_id)
         
         # Calculate statistics
         total_exams = student_exams.count()
         completed_exams = student_exams.filter(completed=1).count()
         avg_score = student_exams.aggregate(avg_score=Avg('score'))['avg_score'] or 0
         
-        # Get performance by subject (if you have subject categorization)
-        subject_performance = {}
-        for exam in student_exams:
-            if exam.qpaper:
-                subject = exam.qpaper.qPaperTitle.split()[0]  # Simple subject extraction
-                if subject not in subject_performance:
-                    subject_performance[subject] = {'total': 0, 'scores': []}
-                subject_performance[subject]['total'] += 1
-                subject_performance[subject]['scores'].append(exam.score)
-        
-        # Calculate averages for each subject
-        for subject in subject_performance:
-            scores = subject_performance[subject]['scores']
-            subject_performance[subject]['avg_score'] = sum(scores) / len(scores) if scores else 0
+        # Get performance by subject, taken as the first word of the paper title
+        # and grouped in SQL so only one row per subject comes back
+        space = StrIndex('qpaper__qPaperTitle', Value(' '))
+        subject_rows = student_exams.filter(qpaper__isnull=False).annotate(
+            subject=Case(
+                When(qpaper__qPaperTitle__contains=' ', then=Left('qpaper__qPaperTitle', space - 1)),
+                default=F('qpaper__qPaperTitle')
+            )
+        ).values('subject').annotate(
+            total=Count('id'),
+            avg_score=Avg('score')
+        ).order_by()
+        subject_performance = {
+            row['subject']: {'total': row['total'], 'avg_score': row['avg_score'] or 0}
+            for row in subject_rows
+        }
         
         return {
             'total_exams': total_exams,
@@ -364,7 +429,7 @@ def get_student_performance_stats(student_id):
         }
         
     except Exception as e:
-        logger.error(f"Error in get_student_performance_stats: {e}")
+        logger.exception("Error in get_student_performance_stats: %s", e)
         return {
             'total_exams': 0,
             'completed_exams': 0,
@@ -0,0 +1,40 @@
+"""
+Signal handlers keeping cached student dashboard data in sync
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from uuid import uuid4
+
+from .models import StuExam_DB
+
+
+def dashboard_stats_cache_key(user_id):
+    """Cache key for a student's dashboard exam statistics"""
+    return f"dash:stats:{user_id}"
+
+
+def api_user_cache_key(user_id, name):
+    """Cache key for a per-user API payload"""
+    return f"api:{name}:{user_id}"
+
+
+def exam_count_generation(user_id):
+    """Tag for a student's cached exam counts; rotated whenever their exams change"""
+    return cache.get_or_set(api_user_cache_key(user_id, 'exam_count_gen'), lambda: uuid4().hex, None)
+
+
+@receiver([post_save, post_delete], sender=StuExam_DB)
+def clear_dashboard_stats(sender, instance, **kwargs):
+    """Drop the student's cached dashboard and API exam data whenever one of their exams changes"""
+    user_id = instance.student_id
+    keys = [
+        dashboard_stats_cache_key(user_id),
+        api_user_cache_key(user_id, 'stats'),
+        api_user_cache_key(user_id, 'recent_activity'),
+        # Count keys vary by filter, so retire them all by rotating their tag
+        api_user_cache_key(user_id, 'exam_count_gen'),
+    ]
+    # Wait for the write to commit so a concurrent read can't re-cache the old data
+    transaction.on_commit(lambda: cache.delete_many(keys))
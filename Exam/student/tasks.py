@@ -0,0 +1,95 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage
+from django.db import connections
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .email_utils import send_messages
+from .utils import account_activation_token
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None
+
+logger = logging.getLogger(__name__)
+
+EMAIL_FROM = 'noreply@exam.com'
+
+# Without a broker, emails go to a small shared pool instead of a new thread each;
+# every worker sends over its own SMTP connection (see email_utils), so they run in parallel
+_email_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='email')
+
+
+def send_email(subject, body, to):
+    send_messages([EmailMessage(subject, body, EMAIL_FROM, to)])
+
+
+def send_activation_email(user_id, domain):
+    """Build the activation link for a freshly registered user and send it."""
+    user = User.objects.only('username', 'email', 'is_active').get(pk=user_id)
+    uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+    link = reverse('activate', kwargs={'uidb64': uidb64, 'token': account_activation_token.make_token(user)})
+    activate_url = f'http://{domain}{link}'
+    email_subject = 'Activate your Exam Portal account'
+    email_body = f'''Hi {user.username},
+
+Please use this link to verify your account: {activate_url}
+
+You are receiving this message because you registered on {domain}. If you didn't register, please contact our support team.
+
+Best regards,
+Exam Portal Team'''
+    send_email(email_subject, email_body, [user.email])
+
+
+if shared_task is not None:
+    @shared_task(bind=True, max_retries=3, default_retry_delay=30, ignore_result=True)
+    def send_email_task(self, subject, body, to):
+        try:
+            send_email(subject, body, to)
+        except Exception as exc:
+            raise self.retry(exc=exc)
+
+    @shared_task(bind=True, max_retries=3, default_retry_delay=30, ignore_result=True)
+    def send_activation_email_task(self, user_id, domain):
+        try:
+            send_activation_email(user_id, domain)
+        except User.DoesNotExist:
+            logger.warning("Skipping activation email for missing user %s", user_id)
+        except Exception as exc:
+            raise self.retry(exc=exc)
+else:
+    send_email_task = send_activation_email_task = None
+
+
+def _run_in_executor(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        logger.exception("Error sending email: %s", e)
+    finally:
+        # Connections are per thread; don't leave this one idle between jobs
+        connections.close_all()
+
+
+def _enqueue(task, func, *args):
+    if task is not None and settings.CELERY_BROKER_URL:
+        task.delay(*args)
+    else:
+        _email_executor.submit(_run_in_executor, func, *args)
+
+
+def queue_email(subject, body, to):
+    """Hand an email to the Celery worker pool, or to the local pool when no broker is configured."""
+    _enqueue(send_email_task, send_email, subject, body, to)
+
+
+def queue_activation_email(user_id, domain):
+    """Queue the activation email; the token and link are generated by whoever sends it."""
+    _enqueue(send_activation_email_task, send_activation_email, user_id, domain)
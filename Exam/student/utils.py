@@ -1,4 +1,7 @@
+from django.contrib.auth.models import User
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db.models import Value
+from django.db.models.functions import Lower
 
 
 class AppTokenGenerator(PasswordResetTokenGenerator):
@@ -7,4 +10,19 @@ class AppTokenGenerator(PasswordResetTokenGenerator):
         return (str(user.is_active) + str(user.pk) + str(timestamp))
 
 
-account_activation_token = AppTokenGenerator()
\ No newline at end of file
+account_activation_token = AppTokenGenerator()
+
+# Unique index on lower(auth_user.email) added by student migration 0005
+EMAIL_UNIQUE_INDEX = 'auth_user_email_uniq'
+
+
+def email_in_use(email, exclude_pk=None):
+    # Same lower() on both sides as the unique index, so the lookup can use it
+    users = User.objects.exclude(email='').alias(email_lower=Lower('email')).filter(email_lower=Lower(Value(email)))
+    if exclude_pk is not None:
+        users = users.exclude(pk=exclude_pk)
+    return users.exists()
+
+
+def is_email_conflict(error):
+    return EMAIL_UNIQUE_INDEX in str(error)
@@ -5,27 +5,41 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import auth
 from django.contrib import messages
 from django.contrib.sites.shortcuts import get_current_site
-from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode 
-from django.urls import reverse
-from django.utils.encoding import force_bytes, force_str, DjangoUnicodeDecodeError
-from .utils import account_activation_token
-from django.core.mail import EmailMessage
-import threading
+from django.conf import settings
+from django.utils.http import urlsafe_base64_decode
+from django.utils.encoding import force_str, DjangoUnicodeDecodeError
+from .utils import account_activation_token, is_email_conflict
+from .tasks import queue_activation_email, queue_email
 from django.contrib.auth.models import User
-from studentPreferences.models import StudentPreferenceModel
 from django.contrib.auth.models import Group
-from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.cache import never_cache
-from django.contrib.auth.password_validation import validate_password
-from django.core.validators import validate_email
 import logging
+from functools import lru_cache, partial
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=1)
+def _student_group_id():
+    # The Student group never changes once created, so look it up once per process
+    return Group.objects.get_or_create(name='Student')[0].pk
+
+REGISTER_FIELD_VALUES_KEY = 'register_field_values'
+PROFILE_PICTURE_MAX_SIZE = 5 * 1024 * 1024
+
+def _registration_failed(request, message):
+    # Redirect back to the form instead of re-rendering it; the password is never kept
+    messages.error(request, message)
+    request.session[REGISTER_FIELD_VALUES_KEY] = {
+        'username': request.POST.get('username', ''),
+        'email': request.POST.get('email', ''),
+    }
+    return redirect('register')
+
 @login_required(login_url='login')
 def index(request):
     return render(request,'student/index.html')
@@ -34,14 +48,12 @@ def index(request):
 class Register(View):
     def get(self, request):
         try:
-            student_form = StudentForm()
-            student_info_form = StudentInfoForm()
+            # Values from a rejected submission survive the redirect in the session
             return render(request, 'student/register.html', {
-                'student_form': student_form,
-                'student_info_form': student_info_form
+                'fieldValues': request.session.pop(REGISTER_FIELD_VALUES_KEY, {})
             })
         except Exception as e:
-            logger.error(f"Error in Register GET: {e}")
+            logger.exception("Error in Register GET: %s", e)
             messages.error(request, "An error occurred while loading the registration page. Please try again.")
             return redirect('login')
     
@@ -52,6 +64,11 @@ class Register(View):
                 messages.error(request, "Invalid request. Please try again.")
                 return redirect('register')
             
+            # Reject oversized pictures before any validation or database work
+            picture = request.FILES.get('picture')
+            if picture and picture.size > PROFILE_PICTURE_MAX_SIZE:
+                return _registration_failed(request, "Profile picture size should be less than 5MB.")
+            
             # Get form data
             student_form = StudentForm(data=request.POST)
             student_info_form = StudentInfoForm(data=request.POST)
@@ -59,56 +76,23 @@ class Register(View):
             
             # Additional validation
             if not email:
-                messages.error(request, "Email is required.")
-                return render(request, 'student/register.html', {
-                    'student_form': student_form,
-                    'student_info_form': student_info_form
-                })
-            
-            # Validate email format
-            try:
-                validate_email(email)
-            except ValidationError:
-                messages.error(request, "Please enter a valid email address.")
-                return render(request, 'student/register.html', {
-                    'student_form': student_form,
-                    'student_info_form': student_info_form
-                })
-            
-            # Check if email already exists
-            if User.objects.filter(email=email).exists():
-                messages.error(request, "An account with this email already exists.")
-                return render(request, 'student/register.html', {
-                    'student_form': student_form,
-                    'student_info_form': student_info_form
-                })
-            
-            # Validate password strength
-            password = request.POST.get('password', '')
-            if password:
-                try:
-                    validate_password(password)
-                except ValidationError as e:
-                    messages.error(request, f"Password validation failed: {'; '.join(e.messages)}")
-                    return render(request, 'student/register.html', {
-                        'student_form': student_form,
-                        'student_info_form': student_info_form
-                    })
+                return _registration_failed(request, "Email is required.")
             
             if student_form.is_valid() and student_info_form.is_valid():
+                # Hash the password before opening the transaction so it only spans the inserts
+                student = student_form.save(commit=False)
+                student.set_password(student.password)
+                student.is_active = True
+                
                 with transaction.atomic():
                     # Create user
-                    student = student_form.save(commit=False)
-                    student.set_password(student.password)
-                    student.is_active = True
                     student.save()
                     
                     # Add to Student group
                     try:
-                        student_group, created = Group.objects.get_or_create(name='Student')
-                        student_group.user_set.add(student)
+                        student.groups.add(_student_group_id())
                     except Exception as e:
-                        logger.error(f"Error adding user to Student group: {e}")
+                        logger.exception("Error adding user to Student group: %s", e)
                         messages.error(request, "Error creating user account. Please contact support.")
                         return redirect('register')
                     
@@ -116,67 +100,39 @@ class Register(View):
                     student_info = student_info_form.save(commit=False)
                     student_info.user = student
                     if 'picture' in request.FILES:
-                        # Validate file size and type
-                        picture = request.FILES['picture']
-                        if picture.size > 5 * 1024 * 1024:  # 5MB limit
-                            messages.error(request, "Profile picture size should be less than 5MB.")
-                            return render(request, 'student/register.html', {
-                                'student_form': student_form,
-                                'student_info_form': student_info_form
-                            })
-                        student_info.picture = picture
+                        student_info.picture = request.FILES['picture']
                     student_info.save()
                     
                     # Send activation email
                     try:
-                        uidb64 = urlsafe_base64_encode(force_bytes(student.pk))
-                        domain = get_current_site(request).domain
-                        link = reverse('activate', kwargs={'uidb64': uidb64, 'token': account_activation_token.make_token(student)})
-                        activate_url = f'http://{domain}{link}'
-                        email_subject = 'Activate your Exam Portal account'
-                        email_body = f'''Hi {student.username},
-
-Please use this link to verify your account: {activate_url}
-
-You are receiving this message because you registered on {domain}. If you didn't register, please contact our support team.
-
-Best regards,
-Exam Portal Team'''
-                        
-                        email_message = EmailMessage(
-                            email_subject,
-                            email_body,
-                            'noreply@exam.com',
-                            [email],
-                        )
-                        EmailThread(email_message).start()
+                        domain = settings.SITE_DOMAIN or get_current_site(request).domain
+                        # Only queue the email once the new account is actually committed;
+                        # the activation token is generated by the sender, off the request path
+                        transaction.on_commit(partial(queue_activation_email, student.pk, domain))
                         
                         messages.success(request, "Registered successfully! Please check your email for account activation.")
-                        logger.info(f"User {student.username} registered successfully")
+                        logger.info("User %s registered successfully", student.username)
                         return redirect('login')
                         
                     except Exception as e:
-                        logger.error(f"Error sending activation email: {e}")
+                        logger.exception("Error sending activation email: %s", e)
                         messages.warning(request, "Account created but activation email could not be sent. Please contact support.")
                         return redirect('login')
             else:
                 # Log form errors
-                logger.warning(f"Registration form validation failed: {student_form.errors}, {student_info_form.errors}")
-                messages.error(request, "Please correct the errors below and try again.")
-                return render(request, 'student/register.html', {
-                    'student_form': student_form,
-                    'student_info_form': student_info_form
-                })
+                logger.warning("Registration form validation failed: %s, %s", student_form.errors, student_info_form.errors)
+                form_errors = [error for form in (student_form, student_info_form) for errors in form.errors.values() for error in errors]
+                return _registration_failed(request, f"Please correct the errors and try again: {' '.join(form_errors)}")
                 
         except IntegrityError as e:
-            logger.error(f"Database integrity error during registration: {e}")
-            messages.error(request, "An account with this username or email already exists.")
-            return render(request, 'student/register.html', {
-                'student_form': student_form,
-                'student_info_form': student_info_form
-            })
+            # The unique index on lower(email) rejects duplicates without a pre-check query
+            if is_email_conflict(e):
+                logger.warning("Registration rejected for %s: email already in use", request.POST.get('username', ''))
+                return _registration_failed(request, "An account with this email already exists.")
+            logger.exception("Database integrity error during registration: %s", e)
+            return _registration_failed(request, "An account with this username or email already exists.")
         except Exception as e:
-            logger.error(f"Unexpected error during registration: {e}")
+            logger.exception("Unexpected error during registration: %s", e)
             messages.error(request, "An unexpected error occurred. Please try again later.")
             return redirect('register')
     
@@ -189,7 +145,7 @@ class LoginView(View):
                 return redirect('index')
             return render(request, 'student/login.html')
         except Exception as e:
-            logger.error(f"Error in LoginView GET: {e}")
+            logger.exception("Error in LoginView GET: %s", e)
             messages.error(request, "An error occurred while loading the login page. Please try again.")
             return render(request, 'student/login.html')
     
@@ -213,41 +169,52 @@ class LoginView(View):
                 messages.error(request, 'Invalid credentials provided.')
                 return render(request, 'student/login.html')
             
-            # Check if user exists
+            # One query for the user, its preferences and Student group membership
             try:
-                user_exists = User.objects.filter(username=username).exists()
-                if user_exists:
-                    user_check = User.objects.get(username=username)
-                    
-                    # Check if user is trying to login as student but is faculty
-                    if user_check.is_staff:
-                        messages.error(request, "You are trying to login as student, but you have registered as faculty. We are redirecting you to faculty login. If you are having problems logging in, please reset your password or contact admin.")
-                        return redirect('faculty-login')
+                user = User.objects.select_related('studentpreferencemodel').annotate(
+                    is_student=Exists(User.groups.through.objects.filter(
+                        user=OuterRef('pk'), group__name='Student'
+                    ))
+                ).filter(username=username).first()
                 
-                # Authenticate user
-                user = auth.authenticate(username=username, password=password)
+                # Check if user is trying to login as student but is faculty
+                if user is not None and user.is_staff:
+                    messages.error(request, "You are trying to login as student, but you have registered as faculty. We are redirecting you to faculty login. If you are having problems logging in, please reset your password or contact admin.")
+                    return redirect('faculty-login')
                 
-                if user:
-                    if user.is_active:
-                        # Check if user is in Student group
-                        if not user.groups.filter(name='Student').exists():
-                            messages.error(request, "Your account is not authorized to access the student portal. Please contact support.")
-                            return render(request, 'student/login.html')
-                        
-                        # Login user
-                        auth.login(request, user)
-                        
-                        # Send login notification email (if enabled)
-                        try:
-                            student_pref = StudentPreferenceModel.objects.filter(user=request.user).first()
-                            send_email = True
-                            
-                            if student_pref:
-                                send_email = student_pref.sendEmailOnLogin
-                            
-                            if send_email:
-                                email_subject = 'You Logged into your Portal account'
-                                email_body = f"""Hi {user.username},
+                if user is None:
+                    # Run the hasher anyway so unknown usernames take as long as wrong passwords
+                    User().set_password(password)
+                    messages.error(request, 'Invalid credentials. Please check your username and password.')
+                    return render(request, 'student/login.html')
+                
+                if not user.check_password(password):
+                    messages.error(request, 'Invalid credentials. Please check your username and password.')
+                    return render(request, 'student/login.html')
+                
+                if not user.is_active:
+                    messages.error(request, 'Account not activated. Please check your email for activation link.')
+                    return render(request, 'student/login.html')
+                
+                # Check if user is in Student group
+                if not user.is_student:
+                    messages.error(request, "Your account is not authorized to access the student portal. Please contact support.")
+                    return render(request, 'student/login.html')
+                
+                # Login user
+                auth.login(request, user)
+                
+                # Send login notification email (if enabled)
+                try:
+                    student_pref = getattr(user, 'studentpreferencemodel', None)
+                    send_email = True
+                    
+                    if student_pref:
+                        send_email = student_pref.sendEmailOnLogin
+                    
+                    if send_email:
+                        email_subject = 'You Logged into your Portal account'
+                        email_body = f"""Hi {user.username},
 
 You have successfully logged into your Exam Portal account.
 
@@ -257,49 +224,25 @@ You are receiving this message because you have enabled login email notification
 
 Best regards,
 Exam Portal Team"""
-                                
-                                email_message = EmailMessage(
-                                    email_subject,
-                                    email_body,
-                                    'noreply@exam.com',
-                                    [user.email],
-                                )
-                                EmailThread(email_message).start()
-                        except Exception as e:
-                            logger.warning(f"Error sending login notification email: {e}")
-                        
-                        messages.success(request, f"Welcome, {user.username}! You are now logged in.")
-                        logger.info(f"User {user.username} logged in successfully")
                         
-                        # Redirect to next page if specified
-                        next_page = request.GET.get('next', 'index')
-                        return redirect(next_page)
-                    else:
-                        messages.error(request, 'Your account is not activated. Please check your email for activation link or contact support.')
-                        return render(request, 'student/login.html')
-                else:
-                    # User doesn't exist or wrong password
-                    if user_exists:
-                        user_obj = User.objects.get(username=username)
-                        if not user_obj.is_active:
-                            messages.error(request, 'Account not activated. Please check your email for activation link.')
-                        else:
-                            messages.error(request, 'Invalid credentials. Please check your username and password.')
-                    else:
-                        messages.error(request, 'Invalid credentials. Please check your username and password.')
-                    
-                    return render(request, 'student/login.html')
+                        queue_email(email_subject, email_body, [user.email])
+                except Exception as e:
+                    logger.warning("Error sending login notification email: %s", e)
+                
+                messages.success(request, f"Welcome, {user.username}! You are now logged in.")
+                logger.info("User %s logged in successfully", user.username)
+                
+                # Redirect to next page if specified
+                next_page = request.GET.get('next', 'index')
+                return redirect(next_page)
                     
-            except User.DoesNotExist:
-                messages.error(request, 'Invalid credentials. Please check your username and password.')
-                return render(request, 'student/login.html')
             except Exception as e:
-                logger.error(f"Error during authentication: {e}")
+                logger.exception("Error during authentication: %s", e)
                 messages.error(request, 'An error occurred during login. Please try again.')
                 return render(request, 'student/login.html')
                 
         except Exception as e:
-            logger.error(f"Unexpected error in LoginView POST: {e}")
+            logger.exception("Unexpected error in LoginView POST: %s", e)
             messages.error(request, "An unexpected error occurred. Please try again later.")
             return render(request, 'student/login.html')
 
@@ -311,39 +254,31 @@ class LogoutView(View):
                 username = request.user.username
                 auth.logout(request)
                 messages.success(request, 'You have been successfully logged out.')
-                logger.info(f"User {username} logged out successfully")
+                logger.info("User %s logged out successfully", username)
             else:
                 messages.info(request, 'You were not logged in.')
             return redirect('login')
         except Exception as e:
-            logger.error(f"Error during logout: {e}")
+            logger.exception("Error during logout: %s", e)
             messages.error(request, "An error occurred during logout. Please try again.")
             return redirect('login')
 
-class EmailThread(threading.Thread):
-	def __init__(self,email):
-		self.email = email
-		threading.Thread.__init__(self)
-
-	
-	def run(self):
-		self.email.send(fail_silently = False)
-
 class VerificationView(View):
 	def get(self,request,uidb64,token):
 		try:
 			id = force_str(urlsafe_base64_decode(uidb64))
-			user = User.objects.get(pk=id)
+			# The activation token only hashes pk and is_active, so load just that column
+			user = User.objects.only('is_active').get(pk=id)
 			if not account_activation_token.check_token(user,token):
 				messages.error(request,"User already Activated. Please Proceed With Login")
 				return redirect("login")
 			if user.is_active:
 				return redirect('login')
 			user.is_active = True
-			user.save()
+			user.save(update_fields=['is_active'])
 			messages.success(request,'Account activated Sucessfully')
 			return redirect('login')
-		except Exception as e:
-			raise e
+		except (User.DoesNotExist, ValueError, DjangoUnicodeDecodeError):
+			messages.error(request,"Invalid activation link. Please register again or contact support.")
 		return redirect('login')
 	
@@ -5,21 +5,33 @@ This script will capture screenshots of different pages
 """
 
 import os
-import time
+import queue
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-def setup_driver():
+MAX_DRIVERS = 4
+
+def setup_driver(load_images=False):
     """Setup Chrome driver with headless options"""
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-gpu")
+    
+    # Screenshots only need layout, so skip image downloads unless asked for
+    prefs = {"profile.default_content_setting_values.notifications": 2}
+    if not load_images:
+        prefs["profile.managed_default_content_settings.images"] = 2
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", prefs)
     
     try:
         driver = webdriver.Chrome(options=chrome_options)
@@ -39,7 +51,10 @@ def take_screenshot(driver, url, filename, wait_for_element=None):
                 EC.presence_of_element_located((By.CSS_SELECTOR, wait_for_element))
             )
         
-        time.sleep(2)  # Wait for page to load completely
+        # Wait until the browser reports the page fully loaded instead of sleeping
+        WebDriverWait(driver, 10).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
         
         # Create screenshots directory
         os.makedirs("screenshots", exist_ok=True)
@@ -54,56 +69,69 @@ def take_screenshot(driver, url, filename, wait_for_element=None):
         print(f"❌ Failed to capture {filename}: {e}")
         return False
 
+def capture_page(page, idle_drivers):
+    """Borrow an idle driver from the pool for one screenshot"""
+    driver = idle_drivers.get()
+    try:
+        return take_screenshot(driver, page["url"], page["filename"], page["wait_for"])
+    finally:
+        idle_drivers.put(driver)
+
 def main():
     """Main function to capture all screenshots"""
     base_url = "http://localhost:8000"
     
-    # Setup driver
-    driver = setup_driver()
-    if not driver:
+    # List of pages to capture
+    pages = [
+        {
+            "url": f"{base_url}/",
+            "filename": "01_homepage.png",
+            "wait_for": "body"
+        },
+        {
+            "url": f"{base_url}/student/login/",
+            "filename": "02_student_login.png",
+            "wait_for": "form"
+        },
+        {
+            "url": f"{base_url}/faculty/login/",
+            "filename": "03_faculty_login.png",
+            "wait_for": "form"
+        },
+        {
+            "url": f"{base_url}/student/register/",
+            "filename": "04_student_register.png",
+            "wait_for": "form"
+        },
+        {
+            "url": f"{base_url}/faculty/register/",
+            "filename": "05_faculty_register.png",
+            "wait_for": "form"
+        }
+    ]
+    
+    # Setup a pool of drivers so pages are captured in parallel; browsers start concurrently too
+    pool_size = min(len(pages), MAX_DRIVERS)
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        drivers = [driver for driver in executor.map(lambda _: setup_driver(), range(pool_size)) if driver]
+    if not drivers:
         print("❌ Could not setup Chrome driver. Please install Chrome and chromedriver.")
         return
     
+    idle_drivers = queue.Queue()
+    for driver in drivers:
+        idle_drivers.put(driver)
+    
     try:
-        # List of pages to capture
-        pages = [
-            {
-                "url": f"{base_url}/",
-                "filename": "01_homepage.png",
-                "wait_for": "body"
-            },
-            {
-                "url": f"{base_url}/student/login/",
-                "filename": "02_student_login.png",
-                "wait_for": "form"
-            },
-            {
-                "url": f"{base_url}/faculty/login/",
-                "filename": "03_faculty_login.png",
-                "wait_for": "form"
-            },
-            {
-                "url": f"{base_url}/student/register/",
-                "filename": "04_student_register.png",
-                "wait_for": "form"
-            },
-            {
-                "url": f"{base_url}/faculty/register/",
-                "filename": "05_faculty_register.png",
-                "wait_for": "form"
-            }
-        ]
-        
         print("🚀 Starting screenshot capture...")
         print(f"📱 Server URL: {base_url}")
         print("=" * 50)
         
-        success_count = 0
         total_count = len(pages)
         
-        for page in pages:
-            if take_screenshot(driver, page["url"], page["filename"], page["wait_for"]):
-                success_count += 1
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            results = executor.map(lambda page: capture_page(page, idle_drivers), pages)
+            success_count = sum(1 for captured in results if captured)
         
         print("=" * 50)
         print(f"📊 Screenshot capture complete!")
@@ -117,7 +145,8 @@ def main():
         print(f"❌ Error during screenshot capture: {e}")
     
     finally:
-        driver.quit()
+        for driver in drivers:
+            driver.quit()
 
 if __name__ == "__main__":
     main()